@@ -4,10 +4,16 @@ import sys
 import os
 import matplotlib.pyplot as plt
 from datetime import datetime
+from string import Template
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from recommendation_engine import NetflixRecommender
+from export import EXPORT_FORMATS, ExportCache, recommendation_columns, render_export
+from model_manager import ModelManager
+from model_registry import ALL_CATALOGS, ModelRegistry
+from results import RecommendationResult
+from token_cache import TokenCache
+from warmup import ResultCache, hot_queries, warm_up
 
 st.set_page_config(
     page_title="Netflix • Find Shows You Love",
@@ -18,11 +24,45 @@ st.set_page_config(
 
 
 @st.cache_resource
-def load_recommender(path):
-    """Load and cache the recommender model"""
-    recommender = NetflixRecommender(path)
-    recommender.build_model()
-    return recommender
+def get_result_cache():
+    """Recommendation results shared by all sessions"""
+    return ResultCache()
+
+
+@st.cache_resource
+def get_model_manager(path):
+    """Create the model manager and start loading or building the recommender in the background"""
+    token_cache = TokenCache(os.path.join(os.path.dirname(path), 'token_cache.sqlite'))
+    result_cache = get_result_cache()
+    # Titles to pre-answer besides the most connected ones, separated by "|"
+    hot_titles = [title for title in os.environ.get('NETFLIX_HOT_TITLES', '').split('|') if title]
+    
+    def warm(recommender, version):
+        # 5 is the default of the Discover results slider
+        warm_up(recommender, result_cache, version, hot_queries(recommender, titles=hot_titles),
+                num_recommendations=(5,))
+    
+    manager = ModelManager(
+        path,
+        build_options={'neighbor_k': 15, 'token_cache': token_cache},
+        artifact_path=os.environ.get('NETFLIX_MODEL_PATH', os.path.join(os.path.dirname(path), 'model_artifact')),
+        warm_up=warm
+    )
+    manager.start_build()
+    manager.watch(interval=10.0)
+    return manager
+
+
+@st.cache_resource
+def get_model_registry():
+    """Regional catalogs split off the served model, shared by all sessions"""
+    return ModelRegistry(build_options={'neighbor_k': 15})
+
+
+@st.cache_resource
+def get_export_cache():
+    """Rendered export files shared by all sessions"""
+    return ExportCache()
 
 
 PREMIUM_CSS = """
@@ -1386,50 +1426,70 @@ st.markdown(PREMIUM_CSS, unsafe_allow_html=True)
 st.markdown(LOADER_HTML, unsafe_allow_html=True)
 
 
-def get_poster_url(title):
-    """Generate placeholder poster URL for export"""
-    return f"https://via.placeholder.com/300x450/e50914/ffffff?text=Poster"
-
-
-def render_movie_card(rank, title, genre, year, description, similarity, poster_url='', movie_key=''):
-    """Render premium movie banner card with animations"""
-    try:
-        if pd.isna(similarity) or similarity is None:
-            similarity = 0
-        sim_pct = max(0, min(100, int(similarity * 100)))
-    except:
-        sim_pct = 0
-    
-    poster_content = f'<img src="{poster_url}" alt="{title}" class="banner-poster-img">' if poster_url else f'<div class="banner-poster-text">{title.upper()[:15]}</div>'
-    
-    html = f"""
-    <div class="movie-banner" id="movie-{movie_key}">
+MOVIE_CARD_TEMPLATE = Template("""
+    <div class="movie-banner" id="movie-$movie_key">
         <div class="banner-poster">
-            {poster_content}
+            $poster_content
         </div>
         <div class="banner-content">
             <div>
                 <div class="banner-header">
-                    <span class="banner-rank">#{rank} Match</span>
+                    <span class="banner-rank">#$rank Match</span>
                 </div>
-                <div class="banner-title">{title}</div>
-                <div class="banner-meta">🎬 {genre}</div>
-                <div class="banner-meta">📅 {year}</div>
-                <div class="banner-description">{description[:180]}...</div>
+                <div class="banner-title">$title</div>
+                <div class="banner-meta">🎬 $genre</div>
+                <div class="banner-meta">📅 $year</div>
+                <div class="banner-description">$description...</div>
             </div>
             <div class="banner-footer">
                 <div class="banner-similarity">
                     <span class="banner-similarity-label">Match Score</span>
-                    <span class="banner-similarity-score">{sim_pct}%</span>
+                    <span class="banner-similarity-score">$sim_pct%</span>
                 </div>
                 <div class="banner-similarity-bar">
-                    <div class="banner-similarity-fill" style="width: {sim_pct}%;"></div>
+                    <div class="banner-similarity-fill" style="width: $sim_pct%;"></div>
                 </div>
             </div>
         </div>
     </div>
-    """
-    return html
+    """)
+
+
+def render_movie_card(rank, title, genre, year, description, similarity, poster_url='', movie_key=''):
+    """Render premium movie banner card with animations"""
+    try:
+        if pd.isna(similarity) or similarity is None:
+            similarity = 0
+        sim_pct = max(0, min(100, int(similarity * 100)))
+    except:
+        sim_pct = 0
+    
+    poster_content = f'<img src="{poster_url}" alt="{title}" class="banner-poster-img">' if poster_url else f'<div class="banner-poster-text">{title.upper()[:15]}</div>'
+    
+    return MOVIE_CARD_TEMPLATE.substitute(
+        movie_key=movie_key,
+        poster_content=poster_content,
+        rank=rank,
+        title=title,
+        genre=genre,
+        year=year,
+        description=str(description)[:180],
+        sim_pct=sim_pct,
+    )
+
+
+def render_movie_cards(recs):
+    """Render every recommendation card as one HTML block"""
+    columns = [recs[col] if col in recs.columns else [default] * len(recs)
+               for col, default in (('title', 'Unknown'), ('listed_in', 'Unknown'), ('release_year', 'N/A'),
+                                    ('description', 'No description available'), ('poster_url', ''))]
+    cards = [
+        render_movie_card(rank, title, genre, year, desc, score, poster_url or '', f"rec-{rank}")
+        for rank, (title, genre, year, desc, poster_url, score)
+        in enumerate(zip(*columns, recs.scores), 1)
+    ]
+    return "".join(cards)
+
 
 def get_movie_details_html(movie_data):
     """Generate HTML for movie details"""
@@ -1496,6 +1556,12 @@ def get_movie_details_html(movie_data):
     
     return ''.join(html_parts)
 
+def request_movie_details():
+    """Queue the picked title's details dialog and reset the picker so it can be picked again"""
+    st.session_state.details_requested = st.session_state.details_select
+    st.session_state.details_select = None
+
+
 @st.dialog("Movie Details")
 def show_movie_details_dialog(movie_data):
     st.html(get_movie_details_html(movie_data))
@@ -1613,6 +1679,11 @@ def render_home_page():
         """, unsafe_allow_html=True)
 
 
+def run_discover_query(recommender, model_version, search_type, query, num_recs):
+    """Run a Discover page query through the shared result cache"""
+    return get_result_cache().query(recommender, model_version, search_type, query, num_recs)
+
+
 def render_discover_page(data_path):
     """Render discover page with recommendations"""
     st.markdown("""
@@ -1622,14 +1693,50 @@ def render_discover_page(data_path):
     </div>
     """, unsafe_allow_html=True)
     
-    with st.spinner("🔄 Loading AI engine..."):
-        recommender = load_recommender(data_path)
+    manager = get_model_manager(data_path)
+    manager.check_source()
+    recommender, model_version = manager.snapshot()
+    status = manager.status()
     
-    st.success("✅ AI engine ready!")
+    if recommender is None:
+        if status['error']:
+            st.error(f"❌ AI engine failed to build: {status['error']}")
+        else:
+            st.info("🔄 AI engine is loading and warming up in the background...")
+        st.button("🔄 Check again", key="check_model_ready")
+        return
     
+    if status['building']:
+        st.success("✅ AI engine ready! (updating in the background)")
+    else:
+        st.success("✅ AI engine ready!")
+    
+    registry = get_model_registry()
+    registry.use_base(recommender, model_version)
+    catalogs = registry.catalog_ids()
+    region = ALL_CATALOGS
+    if len(catalogs) > 2:
+        region = st.selectbox(
+            "Region:",
+            catalogs,
+            format_func=lambda catalog: "🌍 All regions" if catalog == ALL_CATALOGS else f"📍 {catalog}",
+            key="region"
+        )
+    
+    if region == ALL_CATALOGS:
+        render_discover_results(recommender, model_version)
+    else:
+        # Held for the whole render so the catalog is not evicted mid-request;
+        # results are only valid for the catalog and model they came from
+        with registry.acquire(region) as regional:
+            render_discover_results(regional, (region, model_version))
+
+
+def render_discover_results(recommender, model_version):
+    """Render the Discover search form and results for one catalog"""
     search_mode = st.radio(
         "Search by:",
-        ["🎬 Title", "🏷️ Genre/Tag"],
+        ["🎬 Title", "🏷️ Genre/Tag", "✍️ Describe It"],
         horizontal=True,
         label_visibility="collapsed",
         key="search_mode"
@@ -1641,11 +1748,26 @@ def render_discover_page(data_path):
     
     with col1:
         if search_mode == "🎬 Title":
-            search_input = st.selectbox(
+            title_query = st.text_input(
                 "Search for a show:",
-                recommender.df['title'].unique(),
                 label_visibility="collapsed",
-                key="search"
+                key="title_query",
+                placeholder="Start typing a title..."
+            )
+            # Keyed on the query so the first match is selected as the matches change
+            search_input = st.selectbox(
+                "Matching shows:",
+                recommender.search_titles(title_query, 20),
+                label_visibility="collapsed",
+                key=f"search_{title_query}",
+                placeholder="No matching shows" if title_query else "Type above to find a show"
+            )
+        elif search_mode == "✍️ Describe It":
+            search_input = st.text_input(
+                "Describe what you want to watch:",
+                label_visibility="collapsed",
+                key="text_query",
+                placeholder="e.g. dark sci-fi mystery with time travel"
             )
         else:
             available_tags = recommender.get_all_tags()
@@ -1665,27 +1787,46 @@ def render_discover_page(data_path):
     if st.button("🔍 Get Recommendations", use_container_width=True, key="get_recs"):
         if search_mode == "🏷️ Genre/Tag" and (not search_input or len(search_input) == 0):
             st.error("❌ Please select at least one genre or tag")
+        elif search_mode == "🎬 Title" and not search_input:
+            st.error("❌ Please pick a show")
+        elif search_mode == "✍️ Describe It" and not search_input.strip():
+            st.error("❌ Please describe what you want to watch")
         else:
             with st.spinner("🎬 Finding perfect matches..."):
                 if search_mode == "🎬 Title":
-                    recs = recommender.get_recommendations(search_input, num_recs)
-                    st.session_state.current_search_type = "title"
+                    search_type = "title"
+                elif search_mode == "✍️ Describe It":
+                    search_type = "text"
                 else:
-                    recs = recommender.get_recommendations_by_multiple_tags(search_input, num_recs)
-                    st.session_state.current_search_type = "tag"
+                    search_type = "tag"
+                recs = run_discover_query(recommender, model_version, search_type, search_input, num_recs)
+                if search_type == "text" and recs is None:
+                    st.warning("🤔 No shows match those words. Try describing genres, themes or people.")
                 
-                st.session_state.recommendations = recs
+                # Keep only row ids, scores and the query; display columns are
+                # gathered from the shared catalog on each render
+                st.session_state.recommendations = recs.to_state() if recs is not None else None
+                st.session_state.current_search_type = search_type
                 st.session_state.current_movie_title = search_input
                 st.session_state.current_num_recs = num_recs
+                st.session_state.current_model_version = model_version
+    
+    if (st.session_state.get("recommendations") is not None
+            and st.session_state.get("current_model_version") != model_version):
+        # Row ids refer to the model the query ran on; rerun it on the new one
+        recs = run_discover_query(recommender, model_version, st.session_state.current_search_type,
+                                  st.session_state.current_movie_title, st.session_state.current_num_recs)
+        st.session_state.recommendations = recs.to_state() if recs is not None else None
+        st.session_state.current_model_version = model_version
     
     if "recommendations" in st.session_state and st.session_state.recommendations is not None:
-        recs = st.session_state.recommendations
+        recs = RecommendationResult.from_state(st.session_state.recommendations, recommender.catalog)
         movie_title = st.session_state.current_movie_title
         num_recs = st.session_state.current_num_recs
         search_type = st.session_state.get("current_search_type", "title")
         
         if search_type == "title":
-            movie_info = recommender.df[recommender.df['title'] == movie_title].iloc[0]
+            movie_info = recommender.catalog.row(recs.meta['query_id'])
             st.markdown(f"### You selected: **{movie_title}**")
             try:
                 genre_info = movie_info.get('listed_in', 'Unknown')
@@ -1693,82 +1834,77 @@ def render_discover_page(data_path):
                 st.caption(f"🎬 {genre_info} • 📅 {year_info}")
             except:
                 pass
+        elif search_type == "text":
+            st.markdown(f"### You described: **{movie_title}**")
         else:
             tags_str = ", ".join(movie_title) if isinstance(movie_title, list) else str(movie_title)
             st.markdown(f"### Genres/Tags: **{tags_str}**")
-            all_movies_with_tags = pd.DataFrame()
-            for tag in (movie_title if isinstance(movie_title, list) else [movie_title]):
-                try:
-                    movies_with_tag = recommender.df[recommender.df['listed_in'].str.contains(tag, case=False, na=False)]
-                    all_movies_with_tags = pd.concat([all_movies_with_tags, movies_with_tag]).drop_duplicates()
-                except:
-                    pass
-            movies_count = len(all_movies_with_tags)
-            st.caption(f"🏷️ {movies_count} movies/shows match these tags")
+            movies_count = recs.meta.get('matched_count', 0)
+            tag_counts = recs.meta.get('tag_counts', {})
+            breakdown = " • ".join(f"{tag}: {count}" for tag, count in tag_counts.items()) if len(tag_counts) > 1 else ""
+            st.caption(f"🏷️ {movies_count} movies/shows match these tags" + (f" ({breakdown})" if breakdown else ""))
         
         st.markdown("---")
         
         st.markdown(f"### 🏆 Top {num_recs} Matches")
         
-        for idx, (_, row) in enumerate(recs.iterrows(), 1):
-            try:
-                title = row.get('title', 'Unknown')
-                genre = row.get('listed_in', 'Unknown')
-                year = row.get('release_year', 'N/A')
-                desc = row.get('description', 'No description available')
-                sim_score = row.get('similarity_score', 0)
-                
-                if pd.isna(sim_score):
-                    sim_score = 0
-                
-                st.markdown(
-                    render_movie_card(
-                        idx,
-                        title,
-                        genre,
-                        year,
-                        desc,
-                        sim_score,
-                        row.get('poster_url', ''),
-                        f"rec-{idx}"
-                    ),
-                    unsafe_allow_html=True
-                )
-            except Exception as e:
-                st.error(f"Error displaying recommendation {idx}: {str(e)}")
-            
-            if st.button(f"View Details", key=f"details-btn-{idx}", use_container_width=True):
-                movie_title_to_show = row['title']
-                movie_row = recommender.df[recommender.df['title'] == movie_title_to_show]
-                if len(movie_row) > 0:
-                    show_movie_details_dialog(movie_row.iloc[0].to_dict())
+        # All cards go out as a single markdown element instead of one
+        # element and one button per card
+        try:
+            st.markdown(render_movie_cards(recs), unsafe_allow_html=True)
+        except Exception as e:
+            st.error(f"Error displaying recommendations: {str(e)}")
+        
+        labels = {row_id: f"#{rank} {title}"
+                  for rank, (row_id, title) in enumerate(zip(recs.ids.tolist(), recs['title']), 1)}
+        st.selectbox(
+            "View details:",
+            list(labels),
+            index=None,
+            format_func=labels.get,
+            placeholder="🔎 View details for...",
+            label_visibility="collapsed",
+            key="details_select",
+            on_change=request_movie_details
+        )
+        # Open the dialog once per pick, not on every later rerun
+        details_id = st.session_state.pop("details_requested", None)
+        if details_id is not None:
+            movie_data = recommender.get_item(details_id)
+            if movie_data is not None:
+                show_movie_details_dialog(movie_data)
         
         st.markdown("---")
         
-        col1, col2 = st.columns([2, 1])
+        col1, col2, col3 = st.columns([2, 0.8, 1.2])
         with col1:
             st.markdown("### 📥 Export Recommendations")
         with col2:
-            if st.button("💾 Download as Excel", use_container_width=True):
-                export_df = recs.copy()
-                export_df['poster_url'] = export_df['title'].apply(get_poster_url)
-                export_df['match_rank'] = range(1, len(export_df) + 1)
-                export_df['similarity_percentage'] = (export_df['similarity_score'] * 100).astype(int).astype(str) + '%'
-                
-                cols_to_export = ['match_rank', 'title', 'type', 'listed_in', 'release_year', 'similarity_percentage', 'poster_url', 'description']
-                export_df_final = export_df[[col for col in cols_to_export if col in export_df.columns]]
-                
-                with pd.ExcelWriter('recommendations_export.xlsx', engine='openpyxl') as writer:
-                    export_df_final.to_excel(writer, sheet_name='Recommendations', index=False)
-                
-                with open('recommendations_export.xlsx', 'rb') as f:
-                    st.download_button(
-                        label="✅ Click to download",
-                        data=f.read(),
-                        file_name=f"netflix_recommendations_{movie_title.replace(' ', '_')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-    elif "recommendations" in st.session_state and st.session_state.recommendations is None:
+            export_format = st.selectbox(
+                "Format",
+                list(EXPORT_FORMATS),
+                label_visibility="collapsed",
+                key="export_format"
+            )
+        with col3:
+            query = tuple(movie_title) if isinstance(movie_title, list) else movie_title
+            export_key = (search_type, query, num_recs, st.session_state.get("current_model_version"), export_format)
+            export_cache = get_export_cache()
+            name = "_".join(query) if isinstance(query, tuple) else str(query)
+            # Rendered only when the button is clicked, off the script thread
+            st.download_button(
+                label=f"💾 Download as {export_format.upper()}",
+                data=lambda: export_cache.get_or_render(
+                    export_key,
+                    lambda: render_export(recommendation_columns(recs), export_format)
+                ),
+                file_name=f"netflix_recommendations_{name.replace(' ', '_')}.{export_format}",
+                mime=EXPORT_FORMATS[export_format],
+                use_container_width=True,
+                key="download_export"
+            )
+    elif ("recommendations" in st.session_state and st.session_state.recommendations is None
+            and st.session_state.get("current_search_type", "title") == "title"):
         st.error("❌ Show not found")
 
 
@@ -1984,9 +2120,15 @@ def main():
     else:
         st.session_state.page = current_page
     
-    data_path = os.path.join(os.path.dirname(__file__), 'data', 'netflix_sample.csv')
+    data_path = os.environ.get(
+        'NETFLIX_DATA_PATH',
+        os.path.join(os.path.dirname(__file__), 'data', 'netflix_sample.csv')
+    )
     current_page = st.session_state.page
     
+    # Start the model build early so it is ready by the time Discover is opened
+    get_model_manager(data_path)
+    
     if current_page == "🏠 Home":
         render_home_page()
     elif current_page == "🎯 Discover":
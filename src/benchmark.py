@@ -0,0 +1,178 @@
+import time
+import numpy as np
+
+
+def time_calls(func, calls, repeats=3):
+    """
+    Time repeated calls of a function.
+    
+    Args:
+        func (callable): Function to time
+        calls (list): Argument tuples, one per call
+        repeats (int): Number of passes over the calls
+        
+    Returns:
+        dict: Call count and mean/p50/p95/max latency in milliseconds
+    """
+    latencies = []
+    for _ in range(repeats):
+        for args in calls:
+            start = time.perf_counter()
+            func(*args)
+            latencies.append((time.perf_counter() - start) * 1000)
+    
+    latencies = np.array(latencies)
+    return {
+        'calls': len(latencies),
+        'mean_ms': float(latencies.mean()),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'max_ms': float(latencies.max()),
+    }
+
+
+def sample_titles(recommender, count=50, seed=42):
+    """
+    Pick distinct catalog titles to use as benchmark queries.
+    
+    Args:
+        recommender (NetflixRecommender): Built recommender
+        count (int): Number of titles
+        seed (int): Random seed
+        
+    Returns:
+        list: Titles
+    """
+    titles = recommender.catalog.unique('title')
+    rng = np.random.default_rng(seed)
+    return list(rng.choice(titles, size=min(count, len(titles)), replace=False))
+
+
+def diversity_stats(recommender, result):
+    """
+    Measure how varied a recommendation result is.
+    
+    Args:
+        recommender (NetflixRecommender): Recommender that produced the result
+        result (RecommendationResult): Recommendations to measure
+        
+    Returns:
+        dict: Fraction of distinct titles and mean pairwise cosine similarity
+    """
+    if result is None or len(result) < 2:
+        return {'distinct_titles': 1.0, 'mean_pairwise_similarity': 0.0}
+    
+    vectors = recommender.item_vectors(result.ids)
+    pairwise = (vectors @ vectors.T).toarray()
+    upper = pairwise[np.triu_indices(len(result), k=1)]
+    return {
+        'distinct_titles': len(set(result['title'])) / len(result),
+        'mean_pairwise_similarity': float(upper.mean()),
+    }
+
+
+def benchmark_diversity(recommender, titles=None, num_recommendations=10, repeats=3):
+    """
+    Compare latency and result diversity with and without re-ranking.
+    
+    Args:
+        recommender (NetflixRecommender): Built recommender
+        titles (list): Query titles; defaults to a sample of the catalog
+        num_recommendations (int): Results per query
+        repeats (int): Timing passes over the titles
+        
+    Returns:
+        dict: Latency and diversity stats per re-ranking method
+    """
+    titles = titles or sample_titles(recommender)
+    report = {}
+    for method in (None, 'collapse', 'mmr'):
+        def query(title):
+            return recommender.get_recommendations(title, num_recommendations, as_frame=False, diversify=method)
+        
+        stats = time_calls(query, [(title,) for title in titles], repeats)
+        results = [query(title) for title in titles]
+        diversity = [diversity_stats(recommender, result) for result in results if result is not None]
+        stats['distinct_titles'] = float(np.mean([d['distinct_titles'] for d in diversity]))
+        stats['mean_pairwise_similarity'] = float(np.mean([d['mean_pairwise_similarity'] for d in diversity]))
+        report[method or 'none'] = stats
+        print(f"{method or 'none':>8}: p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, "
+              f"distinct titles {stats['distinct_titles']:.0%}, "
+              f"mean pairwise similarity {stats['mean_pairwise_similarity']:.3f}")
+    return report
+
+
+def benchmark_queries(recommender, titles=None, num_recommendations=10, repeats=3):
+    """
+    Measure query latency for each kind of recommendation query.
+    
+    Args:
+        recommender (NetflixRecommender): Built recommender
+        titles (list): Query titles; defaults to a sample of the catalog
+        num_recommendations (int): Results per query
+        repeats (int): Timing passes over the queries
+        
+    Returns:
+        dict: Latency stats for title, tag and text queries
+    """
+    titles = titles or sample_titles(recommender)
+    tags = recommender.get_all_tags()[:len(titles)]
+    descriptions = [recommender.catalog.take('description', recommender.catalog.find('title', title))
+                    for title in titles]
+    queries = {
+        'title': (recommender.get_recommendations, [(title,) for title in titles]),
+        'tag': (recommender.get_recommendations_by_tag, [(tag,) for tag in tags]),
+        'text': (recommender.get_recommendations_by_text, [(text,) for text in descriptions if text]),
+    }
+    report = {}
+    for name, (method, calls) in queries.items():
+        def query(value):
+            return method(value, num_recommendations, as_frame=False)
+        
+        report[name] = time_calls(query, calls, repeats)
+        print(f"{name:>8}: p50 {report[name]['p50_ms']:.2f} ms, p95 {report[name]['p95_ms']:.2f} ms "
+              f"over {report[name]['calls']} calls")
+    return report
+
+
+def benchmark_card_rendering(recommender, render_card, render_cards, titles=None, num_recommendations=15,
+                             repeats=3):
+    """
+    Compare building the Discover page cards one by one with the batched path.
+    
+    The loop reads each row of the result DataFrame and renders its card, as
+    the page did before cards were batched; the batched path renders every
+    card of a RecommendationResult in one pass. Only the HTML is built, so
+    the per-element round-trips the old loop also paid are not included.
+    The render functions come from app.py, which needs Streamlit.
+    
+    Args:
+        recommender (NetflixRecommender): Built recommender
+        render_card (callable): app.render_movie_card
+        render_cards (callable): app.render_movie_cards
+        titles (list): Query titles; defaults to a sample of the catalog
+        num_recommendations (int): Cards per page
+        repeats (int): Timing passes over the titles
+        
+    Returns:
+        dict: Latency stats for the 'loop' and 'batched' paths
+    """
+    titles = titles or sample_titles(recommender)
+    results = [recommender.get_recommendations(title, num_recommendations, as_frame=False) for title in titles]
+    results = [result for result in results if result is not None]
+    
+    def loop(result):
+        frame = result.to_frame()
+        return [
+            render_card(rank, row.get('title', 'Unknown'), row.get('listed_in', 'Unknown'),
+                        row.get('release_year', 'N/A'), row.get('description', 'No description available'),
+                        row.get('similarity_score', 0), row.get('poster_url', ''), f"rec-{rank}")
+            for rank, (_, row) in enumerate(frame.iterrows(), 1)
+        ]
+    
+    report = {}
+    for name, render in (('loop', loop), ('batched', render_cards)):
+        report[name] = time_calls(render, [(result,) for result in results], repeats)
+        print(f"{name:>8}: p50 {report[name]['p50_ms']:.2f} ms, p95 {report[name]['p95_ms']:.2f} ms "
+              f"for {num_recommendations} cards")
+    return report
@@ -0,0 +1,327 @@
+import sys
+import numpy as np
+import pandas as pd
+
+
+def _smallest_int_dtype(max_value):
+    """Pick the narrowest signed integer dtype that can hold max_value."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class CategoricalColumn:
+    """String column stored as integer codes into a table of interned values."""
+
+    __slots__ = ('codes', 'categories')
+
+    def __init__(self, values):
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        categories = [sys.intern(str(value)) for value in uniques] + [None]
+        codes[codes < 0] = len(categories) - 1
+        self.codes = codes.astype(_smallest_int_dtype(len(categories)))
+        self.categories = np.array(categories, dtype=object)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def take(self, ids):
+        return self.categories[self.codes[ids]]
+
+    def contains(self, pattern, regex=True):
+        """Regex-match the distinct values once and broadcast the result to rows."""
+        matches = pd.Series(self.categories).str.contains(pattern, case=False, na=False, regex=regex).to_numpy()
+        return matches[self.codes]
+
+    def find(self, value):
+        """Return the first row holding value exactly, or None."""
+        hits = np.flatnonzero(self.categories == value)
+        if len(hits) == 0:
+            return None
+        rows = np.flatnonzero(self.codes == hits[0])
+        return int(rows[0]) if len(rows) else None
+
+    def unique(self):
+        return [value for value in self.categories if value is not None]
+
+    def nbytes(self):
+        return self.codes.nbytes + self.categories.nbytes + sum(
+            sys.getsizeof(value) for value in self.categories if value is not None
+        )
+
+
+class TextColumn:
+    """Long free text stored as one UTF-8 byte buffer plus row offsets."""
+
+    __slots__ = ('offsets', 'buffer', 'missing')
+
+    def __init__(self, values):
+        values = pd.Series(values)
+        self.missing = values.isna().to_numpy()
+        encoded = [b'' if missing else str(value).encode('utf-8')
+                   for value, missing in zip(values, self.missing)]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in encoded], out=self.offsets[1:])
+        self.buffer = b''.join(encoded)
+
+    def __len__(self):
+        return len(self.missing)
+
+    def _value(self, row):
+        if self.missing[row]:
+            return None
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]].decode('utf-8')
+
+    def take(self, ids):
+        return np.array([self._value(row) for row in np.atleast_1d(ids)], dtype=object)
+
+    def contains(self, pattern, regex=True):
+        return pd.Series(self.take(np.arange(len(self)))).str.contains(
+            pattern, case=False, na=False, regex=regex).to_numpy()
+
+    def find(self, value):
+        for row in range(len(self)):
+            if self._value(row) == value:
+                return row
+        return None
+
+    def unique(self):
+        return list(dict.fromkeys(value for value in self.take(np.arange(len(self))) if value is not None))
+
+    def nbytes(self):
+        return self.offsets.nbytes + len(self.buffer) + self.missing.nbytes
+
+
+class NumericColumn:
+    """Numeric column downcast to the narrowest integer dtype that fits."""
+
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        values = pd.Series(values)
+        if pd.api.types.is_integer_dtype(values) and len(values):
+            low, high = values.min(), values.max()
+            dtype = _smallest_int_dtype(max(abs(int(low)), abs(int(high))))
+            self.values = values.to_numpy().astype(dtype)
+        else:
+            self.values = values.to_numpy()
+
+    def __len__(self):
+        return len(self.values)
+
+    def take(self, ids):
+        return self.values[ids]
+
+    def contains(self, pattern, regex=True):
+        return pd.Series(self.values).astype(str).str.contains(
+            pattern, case=False, na=False, regex=regex).to_numpy()
+
+    def find(self, value):
+        rows = np.flatnonzero(self.values == value)
+        return int(rows[0]) if len(rows) else None
+
+    def unique(self):
+        return list(pd.unique(self.values))
+
+    def nbytes(self):
+        return self.values.nbytes
+
+
+class CatalogRow:
+    """Read-only view of one catalog row; values are decoded on access."""
+
+    __slots__ = ('_store', 'row_id')
+
+    def __init__(self, store, row_id):
+        self._store = store
+        self.row_id = row_id
+
+    def __getitem__(self, name):
+        return self._store.take(name, self.row_id)
+
+    def get(self, name, default=None):
+        if not self._store.has_column(name):
+            return default
+        value = self[name]
+        return default if value is None else value
+
+    def to_dict(self):
+        return {name: self[name] for name in self._store.columns}
+
+    def __repr__(self):
+        return f"CatalogRow({self.row_id}, {self.to_dict()!r})"
+
+
+class CatalogStore:
+    """
+    Compact column store for the catalog fields shown to users.
+
+    Strings with repeated values become interned categories with narrow
+    integer codes, mostly-unique long text is packed into a single byte
+    buffer with offsets, and integers such as release_year are downcast
+    (int16 for years). Rows are accessed through CatalogRow views.
+    """
+
+    def __init__(self, columns):
+        """
+        Initialize the store from encoded columns.
+
+        Args:
+            columns (dict): Mapping of column name to encoded column, all the same length
+        """
+        self._columns = dict(columns)
+        lengths = {len(values) for values in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Catalog columns have different lengths: {sorted(lengths)}")
+        self._num_rows = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Encode a set of columns.
+
+        Object columns become categorical when at most half of their values
+        are distinct and a text buffer otherwise.
+
+        Args:
+            columns (dict): Mapping of column name to pd.Series
+
+        Returns:
+            CatalogStore: Store holding the encoded columns
+        """
+        encoded = {}
+        for name, values in columns.items():
+            if pd.api.types.is_numeric_dtype(values):
+                encoded[name] = NumericColumn(values)
+            elif values.nunique(dropna=False) <= len(values) // 2:
+                encoded[name] = CategoricalColumn(values)
+            else:
+                encoded[name] = TextColumn(values)
+        return cls(encoded)
+
+    @classmethod
+    def from_dataframe(cls, df, columns):
+        """
+        Encode the given DataFrame columns.
+
+        Args:
+            df (pd.DataFrame): Dataset
+            columns (list): Column names to keep; missing ones are skipped
+
+        Returns:
+            CatalogStore: Store holding the available columns
+        """
+        return cls.from_columns({col: df[col] for col in columns if col in df.columns})
+
+    def __len__(self):
+        return self._num_rows
+
+    def __getitem__(self, row_id):
+        return self.row(row_id)
+
+    @property
+    def columns(self):
+        """list: Names of the stored columns, in insertion order."""
+        return list(self._columns)
+
+    def has_column(self, name):
+        return name in self._columns
+
+    def row(self, row_id):
+        """
+        Get a view of one row.
+
+        Args:
+            row_id (int): Positional row id
+
+        Returns:
+            CatalogRow: Lazy view of the row
+        """
+        if not 0 <= row_id < self._num_rows:
+            raise IndexError(f"Row id {row_id} out of range for catalog of {self._num_rows} rows")
+        return CatalogRow(self, int(row_id))
+
+    def take(self, name, ids):
+        """
+        Decode one column for a row id or an array of row ids.
+
+        Args:
+            name (str): Column name
+            ids (int or np.ndarray): Row ids
+
+        Returns:
+            Value for a single id, or np.ndarray of values
+        """
+        column = self._columns[name]
+        if np.ndim(ids) == 0:
+            return column.take(np.array([ids]))[0]
+        return column.take(np.asarray(ids))
+
+    def column(self, name):
+        """Decode a full column."""
+        return self.take(name, np.arange(self._num_rows))
+
+    def contains(self, name, pattern, regex=True):
+        """
+        Case-insensitive regex or substring match against a column.
+
+        Args:
+            name (str): Column name
+            pattern (str): Pattern passed to str.contains
+            regex (bool): If False, match pattern as a literal substring
+
+        Returns:
+            np.ndarray: Boolean mask over all rows
+        """
+        return self._columns[name].contains(pattern, regex=regex)
+
+    def find(self, name, value):
+        """Return the first row id whose column equals value exactly, or None."""
+        return self._columns[name].find(value)
+
+    def unique(self, name):
+        """Distinct non-null values of a column in first-seen order."""
+        return self._columns[name].unique()
+
+    def memory_usage(self):
+        """
+        Approximate memory held by the store.
+
+        Returns:
+            dict: Bytes per column plus a 'total' entry
+        """
+        usage = {name: column.nbytes() for name, column in self._columns.items()}
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def memory_report(self, source, frame=None):
+        """
+        Compare the store footprint with the same columns held by pandas.
+
+        The raw frame the columns were read from stays loaded next to the
+        store, so the totals count it on both sides: the frame plus the
+        store, against the frame with the columns added to it.
+
+        Args:
+            source (pd.DataFrame or dict): Columns the store was built from
+            frame (pd.DataFrame): Raw frame held alongside the store, if any
+
+        Returns:
+            dict: 'catalog_bytes' and 'dataframe_bytes' of the columns,
+            'frame_bytes', 'total_bytes' actually held, 'baseline_bytes'
+            and the 'ratio' of the totals
+        """
+        catalog_bytes = self.memory_usage()['total']
+        dataframe_bytes = int(sum(source[col].memory_usage(deep=True, index=False) for col in self.columns))
+        frame_bytes = int(frame.memory_usage(deep=True).sum()) if frame is not None else 0
+        total_bytes = frame_bytes + catalog_bytes
+        baseline_bytes = frame_bytes + dataframe_bytes
+        return {
+            'catalog_bytes': catalog_bytes,
+            'dataframe_bytes': dataframe_bytes,
+            'frame_bytes': frame_bytes,
+            'total_bytes': total_bytes,
+            'baseline_bytes': baseline_bytes,
+            'ratio': total_bytes / baseline_bytes if baseline_bytes else 0.0,
+        }
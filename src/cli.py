@@ -0,0 +1,205 @@
+import argparse
+import contextlib
+import json
+import sys
+import time
+import numpy as np
+from recommendation_engine import NetflixRecommender
+
+# Exit status codes; argparse itself exits with 2 on usage errors
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_NOT_FOUND = 3
+
+
+def _megabytes(value):
+    return None if value is None else int(value * 1024 * 1024)
+
+
+def _build(args):
+    """Build a recommender from a CSV, with engine output sent to stderr."""
+    token_cache = None
+    if getattr(args, 'token_cache', None):
+        from token_cache import TokenCache
+        token_cache = TokenCache(args.token_cache)
+    with contextlib.redirect_stdout(sys.stderr):
+        recommender = NetflixRecommender(args.data)
+        if recommender.df is None:
+            return None
+        recommender.build_model(
+            neighbor_k=args.neighbor_k,
+            token_cache=token_cache,
+            max_memory_bytes=_megabytes(args.max_memory_mb),
+            n_jobs=args.n_jobs,
+        )
+    return recommender
+
+
+def _open_model(args):
+    """Load the --model artifact, or build from --data when no artifact is given."""
+    if args.model:
+        with contextlib.redirect_stdout(sys.stderr):
+            return NetflixRecommender.load(args.model)
+    return _build(args)
+
+
+def _to_json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def cmd_build(args):
+    start = time.perf_counter()
+    recommender = _build(args)
+    if recommender is None:
+        return EXIT_ERROR
+    with contextlib.redirect_stdout(sys.stderr):
+        recommender.save(args.output)
+    report = {
+        'output': args.output,
+        'rows': len(recommender.soup_index),
+        'seconds': time.perf_counter() - start,
+        'timings': recommender.build_stats.get('timings', {}),
+    }
+    print(json.dumps(report, indent=2))
+    return EXIT_OK
+
+
+def cmd_query(args):
+    recommender = _open_model(args)
+    if recommender is None:
+        return EXIT_ERROR
+    filters = json.loads(args.filters) if args.filters else None
+    with contextlib.redirect_stdout(sys.stderr), contextlib.ExitStack() as stack:
+        if args.catalog:
+            from model_registry import ModelRegistry
+            registry = ModelRegistry(build_options={'neighbor_k': args.neighbor_k})
+            registry.use_base(recommender, 0)
+            recommender = stack.enter_context(registry.acquire(args.catalog))
+        if args.title:
+            result = recommender.get_recommendations(args.title, args.n, as_frame=False, filters=filters)
+        elif args.tags:
+            result = recommender.get_recommendations_by_multiple_tags(args.tags, args.n, as_frame=False,
+                                                                      filters=filters)
+        else:
+            result = recommender.get_recommendations_by_text(args.text, args.n, as_frame=False, filters=filters)
+    if result is None:
+        return EXIT_NOT_FOUND
+
+    recommendations = []
+    for row_id, row in zip(result.ids, result.rows()):
+        entry = {'row_id': int(row_id)}
+        entry.update({name: _to_json_value(value) for name, value in row.items()})
+        recommendations.append(entry)
+    print(json.dumps(recommendations, indent=2))
+    return EXIT_OK
+
+
+def cmd_bulk_export(args):
+    from export import export_neighbor_graph
+
+    recommender = _open_model(args)
+    if recommender is None:
+        return EXIT_ERROR
+    with contextlib.redirect_stdout(sys.stderr):
+        report = export_neighbor_graph(
+            recommender, args.output, k=args.k, fmt=args.format, n_jobs=args.n_jobs,
+            max_memory_bytes=_megabytes(args.max_memory_mb),
+        )
+    print(json.dumps(report, indent=2))
+    return EXIT_OK
+
+
+def cmd_bench(args):
+    from benchmark import benchmark_queries
+
+    recommender = _build(args)
+    if recommender is None:
+        return EXIT_ERROR
+    with contextlib.redirect_stdout(sys.stderr):
+        latency = benchmark_queries(recommender, num_recommendations=args.n, repeats=args.repeats)
+    report = {
+        'rows': len(recommender.soup_index),
+        'build': recommender.build_stats.get('timings', {}),
+        'queries': latency,
+    }
+    print(json.dumps(report, indent=2))
+    return EXIT_OK
+
+
+def build_parser():
+    """
+    Create the argument parser for the netflix recommender CLI.
+
+    Returns:
+        argparse.ArgumentParser: Parser with build, query, bulk-export and bench subcommands
+    """
+    parser = argparse.ArgumentParser(description="Netflix recommender command-line tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_build_options(subparser):
+        subparser.add_argument('--neighbor-k', type=int, default=15, help="Neighbors precomputed per title")
+        subparser.add_argument('--n-jobs', type=int, default=1, help="Threads for blocked similarity")
+        subparser.add_argument('--max-memory-mb', type=float, default=None,
+                               help="Memory budget; computes similarity in blocks when set")
+        subparser.add_argument('--token-cache', default=None, help="Path of a persistent token cache")
+
+    build = subparsers.add_parser('build', help="Build a model from a CSV and save it")
+    build.add_argument('data', help="Dataset CSV")
+    build.add_argument('output', help="Artifact directory to write")
+    add_build_options(build)
+    build.set_defaults(func=cmd_build)
+
+    query = subparsers.add_parser('query', help="Print recommendations as JSON")
+    source = query.add_mutually_exclusive_group(required=True)
+    source.add_argument('--model', help="Saved model artifact")
+    source.add_argument('--data', help="Dataset CSV to build from")
+    target = query.add_mutually_exclusive_group(required=True)
+    target.add_argument('--title', help="Recommend titles similar to this one")
+    target.add_argument('--tags', nargs='+', help="Recommend titles for these genres/tags")
+    target.add_argument('--text', help="Recommend titles matching a free-text description")
+    query.add_argument('-n', type=int, default=10, help="Number of recommendations")
+    query.add_argument('--catalog', help="Query the regional catalog of this country instead of the full one")
+    query.add_argument('--filters', help='Filters as JSON, e.g. \'{"type": "Movie", "min_year": 2015}\'')
+    add_build_options(query)
+    query.set_defaults(func=cmd_query)
+
+    bulk = subparsers.add_parser('bulk-export', help="Write the top-k neighbors of every title")
+    source = bulk.add_mutually_exclusive_group(required=True)
+    source.add_argument('--model', help="Saved model artifact")
+    source.add_argument('--data', help="Dataset CSV to build from")
+    bulk.add_argument('output', help="Directory for the partition files")
+    bulk.add_argument('-k', type=int, default=20, help="Neighbors per title")
+    bulk.add_argument('--format', choices=['parquet', 'csv'], default='parquet')
+    add_build_options(bulk)
+    bulk.set_defaults(func=cmd_bulk_export, max_memory_mb=512)
+
+    bench = subparsers.add_parser('bench', help="Benchmark the build and query latency")
+    bench.add_argument('data', help="Dataset CSV")
+    bench.add_argument('-n', type=int, default=10, help="Recommendations per query")
+    bench.add_argument('--repeats', type=int, default=3, help="Timing passes over the queries")
+    add_build_options(bench)
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the CLI.
+
+    Args:
+        argv (list): Arguments; defaults to sys.argv[1:]
+
+    Returns:
+        int: Exit status (EXIT_OK, EXIT_ERROR, EXIT_USAGE or EXIT_NOT_FOUND)
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+import csv
+import io
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from recommendation_engine import _neighbors_for_block
+
+# Poster shown for titles without an image URL
+PLACEHOLDER_POSTER_URL = "https://via.placeholder.com/300x450/e50914/ffffff?text=Poster"
+
+# Columns of an exported recommendation list, in order
+EXPORT_COLUMNS = ['match_rank', 'title', 'type', 'listed_in', 'release_year',
+                  'similarity_percentage', 'poster_url', 'description']
+
+EXPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def fill_poster_urls(values, placeholder=PLACEHOLDER_POSTER_URL):
+    """
+    Replace missing or empty poster URLs with a placeholder, column at once.
+
+    Args:
+        values (array-like): Poster URLs
+        placeholder (str): URL used where none is set
+
+    Returns:
+        np.ndarray: Poster URLs with every gap filled
+    """
+    values = np.asarray(values, dtype=object)
+    missing = pd.isna(values) | (values == '')
+    return np.where(missing, placeholder, values)
+
+
+def recommendation_columns(result):
+    """
+    Lay out a recommendation result for export, straight from its columns.
+
+    Args:
+        result (RecommendationResult): Recommendations to export
+
+    Returns:
+        dict: Column name to value array, in EXPORT_COLUMNS order, for the
+        columns that are available
+    """
+    columns = {
+        'match_rank': np.arange(1, len(result) + 1),
+        'similarity_percentage': np.array([f"{int(score * 100)}%" for score in result.scores], dtype=object),
+    }
+    if 'poster_url' in result.columns:
+        columns['poster_url'] = fill_poster_urls(result['poster_url'])
+    for column in EXPORT_COLUMNS:
+        if column not in columns and column in result.columns:
+            columns[column] = result[column]
+    return {column: columns[column] for column in EXPORT_COLUMNS if column in columns}
+
+
+def _python_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def render_export(columns, fmt='xlsx', sheet_name='Recommendations'):
+    """
+    Render export columns to file bytes in memory.
+
+    Rows are streamed from the column arrays into the writer; no DataFrame
+    is built.
+
+    Args:
+        columns (dict): Column name to value array, e.g. from
+            recommendation_columns
+        fmt (str): 'xlsx', 'csv' or 'parquet'
+        sheet_name (str): Worksheet name for xlsx
+
+    Returns:
+        bytes: Encoded file content
+    """
+    names = list(columns)
+    rows = zip(*columns.values())
+    if fmt == 'xlsx':
+        buffer = io.BytesIO()
+        # Write-only mode streams rows instead of building a cell tree
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(names)
+        for values in rows:
+            sheet.append([_python_value(value) for value in values])
+        workbook.save(buffer)
+        return buffer.getvalue()
+    if fmt == 'csv':
+        text = io.StringIO()
+        writer = csv.writer(text, lineterminator='\n')
+        writer.writerow(names)
+        writer.writerows(rows)
+        return text.getvalue().encode('utf-8')
+    if fmt == 'parquet':
+        buffer = io.BytesIO()
+        table = pa.Table.from_pydict({name: pa.array(list(values)) for name, values in columns.items()})
+        pq.write_table(table, buffer)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown export format '{fmt}'; use one of {list(EXPORT_FORMATS)}")
+
+
+class ExportCache:
+    """
+    Least-recently-used cache of rendered export bytes.
+
+    Keys identify what was exported, e.g. (query, n, model version, format),
+    so reruns and other sessions asking for the same export reuse the bytes
+    and a model swap naturally invalidates them.
+    """
+
+    def __init__(self, max_entries=64):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Number of exports kept before evicting
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_render(self, key, render):
+        """
+        Return cached bytes for key, rendering and caching them on a miss.
+
+        Args:
+            key (tuple): Hashable export identity
+            render (callable): Called with no arguments to produce the bytes
+
+        Returns:
+            bytes: Export content
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        data = render()
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+
+# Feature matrices shared with bulk export worker processes, set once per worker
+_GRAPH_STATE = {}
+
+
+def _init_graph_worker(tfidf_matrix, soup_index, output_dir, fmt, k):
+    _GRAPH_STATE.update(
+        tfidf_matrix=tfidf_matrix,
+        transposed=tfidf_matrix.T.tocsr(),
+        soup_index=soup_index,
+        # Catalog rows grouped by soup, so a block of soups maps to a row range
+        rows_by_soup=np.argsort(soup_index, kind='stable').astype(np.int32),
+        soup_starts=np.searchsorted(np.sort(soup_index), np.arange(tfidf_matrix.shape[0] + 1)),
+        output_dir=output_dir,
+        fmt=fmt,
+        k=k,
+    )
+
+
+def _export_graph_block(part, start, stop):
+    """
+    Compute and write the neighbor lists of the rows holding a block of soups.
+
+    Returns:
+        tuple: (part, rows exported, edges written)
+    """
+    state = _GRAPH_STATE
+    soup_index, k = state['soup_index'], state['k']
+    width = min(k + 1, len(soup_index))
+    ids, scores = _neighbors_for_block(state['tfidf_matrix'], state['transposed'], soup_index, start, stop, width)
+
+    items = state['rows_by_soup'][state['soup_starts'][start]:state['soup_starts'][stop]]
+    neighbor_ids = ids[soup_index[items] - start]
+    neighbor_scores = scores[soup_index[items] - start]
+    # Drop each row from its own list and keep the first k of the rest
+    keep = neighbor_ids != items[:, None]
+    ranks = np.cumsum(keep, axis=1)
+    keep &= ranks <= k
+
+    edges = pd.DataFrame({
+        'item_id': np.repeat(items, keep.sum(axis=1)),
+        'neighbor_id': neighbor_ids[keep],
+        'rank': ranks[keep].astype(np.int16),
+        'score': neighbor_scores[keep],
+    })
+    path = os.path.join(state['output_dir'], f"part-{part:05d}.{state['fmt']}")
+    if state['fmt'] == 'parquet':
+        edges.to_parquet(path, index=False)
+    else:
+        edges.to_csv(path, index=False)
+    return part, len(items), len(edges)
+
+
+def export_neighbor_graph(recommender, output_dir, k=20, fmt='parquet', n_jobs=None,
+                          max_memory_bytes=512 * 1024 * 1024, progress=True):
+    """
+    Write the top-k neighbors of every catalog row to partitioned files.
+
+    Works from the feature vectors, not the similarity matrix, so it also
+    runs when the dense matrix would not fit in memory. Distinct soups are
+    split into blocks sized to the memory budget; worker processes compute
+    each block's neighbors and write one (item_id, neighbor_id, rank, score)
+    file per block, so no process holds more than a block of scores.
+
+    Args:
+        recommender (NetflixRecommender): Recommender with vectorized features
+        output_dir (str): Directory for the part-NNNNN.<fmt> files; replaced
+            as a whole when the export succeeds
+        k (int): Neighbors per row
+        fmt (str): 'parquet' or 'csv'
+        n_jobs (int): Worker processes; defaults to the CPU count
+        max_memory_bytes (int): Total working memory budget across workers
+        progress (bool): Print progress and throughput after each block
+
+    Returns:
+        dict: files, items, edges, seconds and items_per_second
+    """
+    if recommender.tfidf_matrix is None:
+        raise ValueError("Features not vectorized. Run build_model() first.")
+    if fmt not in ('parquet', 'csv'):
+        raise ValueError(f"Unknown graph export format '{fmt}'; use 'parquet' or 'csv'")
+
+    # Partitions go to a staging directory that replaces output_dir only once
+    # every block is written, so readers never mix two runs' files
+    output_dir = os.path.normpath(output_dir)
+    staging, retired = output_dir + '.staging', output_dir + '.old'
+    for path in (staging, retired):
+        shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(staging)
+    tfidf_matrix, soup_index = recommender.tfidf_matrix, recommender.soup_index
+    num_soups, num_items = tfidf_matrix.shape[0], len(soup_index)
+    n_jobs = max(1, n_jobs or os.cpu_count() or 1)
+    # Each worker holds a dense block of soup scores plus the sparse product
+    # it came from (about 24 bytes per entry) next to its copy of the features
+    per_worker = max_memory_bytes // n_jobs
+    block_rows = int(max(1, min(num_soups, per_worker // (24 * max(num_soups, 1)))))
+    blocks = [(part, start, min(start + block_rows, num_soups))
+              for part, start in enumerate(range(0, num_soups, block_rows))]
+    print(f"\n--- Exporting Neighbor Graph ---")
+    print(f"{num_items} rows, k={k}, {len(blocks)} blocks of {block_rows} soups, {n_jobs} worker(s)")
+
+    start_time = time.perf_counter()
+    items_done = edges_done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_graph_worker,
+                                 initargs=(tfidf_matrix, soup_index, staging, fmt, k)) as pool:
+            futures = [pool.submit(_export_graph_block, *block) for block in blocks]
+            for done, future in enumerate(as_completed(futures), 1):
+                _, items, edges = future.result()
+                items_done += items
+                edges_done += edges
+                if progress:
+                    elapsed = time.perf_counter() - start_time
+                    print(f"  {done}/{len(blocks)} blocks, {items_done}/{num_items} rows "
+                          f"({items_done / max(elapsed, 1e-9):.0f} rows/s)")
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if os.path.exists(output_dir):
+        os.rename(output_dir, retired)
+    os.rename(staging, output_dir)
+    shutil.rmtree(retired, ignore_errors=True)
+
+    seconds = time.perf_counter() - start_time
+    return {
+        'files': len(blocks),
+        'items': items_done,
+        'edges': edges_done,
+        'seconds': seconds,
+        'items_per_second': items_done / max(seconds, 1e-9),
+    }
@@ -0,0 +1,261 @@
+import os
+import shutil
+import threading
+import time
+from recommendation_engine import NetflixRecommender
+from source_watch import diff_rows
+
+
+class ModelManager:
+    """
+    Build recommenders in the background and hot-swap the one being served.
+
+    The serving recommender is only ever replaced by a fully built one: a
+    build runs on a private NetflixRecommender in a worker thread, and the
+    reference is swapped under a lock once build_model has finished. Readers
+    keep whatever reference they got, so an in-flight query finishes on the
+    model it started with while new queries see the new one.
+
+    check_source (or a watch thread calling it) reloads the model when the
+    dataset file changes: incrementally when rows can be matched by key and
+    only a small fraction changed, otherwise with a full rebuild.
+
+    With an artifact_path, the first build loads the saved model instead of
+    building when it was built from the current dataset, and every build is
+    saved there. A warm_up callable runs on each new model before it is
+    swapped in, so the manager only reports ready once the model is warm.
+    """
+
+    def __init__(self, data_path, build_options=None, incremental_threshold=0.1, key='show_id',
+                 artifact_path=None, warm_up=None):
+        """
+        Initialize the manager. No build is started until start_build.
+
+        Args:
+            data_path (str): Path to the Netflix dataset CSV file
+            build_options (dict): Keyword arguments passed to build_model
+            incremental_threshold (float): Largest fraction of changed rows
+                that is applied incrementally instead of rebuilding
+            key (str): Column identifying a row across dataset versions
+            artifact_path (str): Directory of a saved model to start from
+                and to save new builds to
+            warm_up (callable): Called as warm_up(recommender, version)
+                before a new model is served
+        """
+        self.data_path = data_path
+        self.build_options = dict(build_options or {})
+        self.incremental_threshold = incremental_threshold
+        self.key = key
+        self.artifact_path = artifact_path
+        self.warm_up = warm_up
+        self._lock = threading.Lock()
+        self._recommender = None
+        self._thread = None
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self._version = 0
+        self._status = {
+            'building': False,
+            'build_started': None,
+            'build_finished': None,
+            'build_seconds': None,
+            'build_mode': None,
+            'changes': None,
+            'warmup_seconds': None,
+            'error': None,
+        }
+
+    @property
+    def recommender(self):
+        """The fully built recommender being served, or None before the first build."""
+        with self._lock:
+            return self._recommender
+
+    @property
+    def version(self):
+        """Number of successful builds swapped in so far."""
+        with self._lock:
+            return self._version
+
+    def snapshot(self):
+        """
+        Get the served recommender together with its version.
+
+        Returns:
+            tuple: (recommender, version), read under one lock so the
+            version always belongs to the recommender
+        """
+        with self._lock:
+            return self._recommender, self._version
+
+    def is_ready(self):
+        """Readiness probe: True once a built and warmed-up model is served."""
+        return self.recommender is not None
+
+    def status(self):
+        """
+        Report readiness and the state of the latest build.
+
+        Returns:
+            dict: ready, version, building, build_started and build_finished
+            (Unix timestamps), build_seconds, build_mode ('full',
+            'incremental' or 'artifact'), the row changes that triggered it,
+            warmup_seconds and the error of the last build, if it failed
+        """
+        with self._lock:
+            status = dict(self._status)
+            status['ready'] = self._recommender is not None
+            status['version'] = self._version
+        return status
+
+    def start_build(self, data_path=None):
+        """
+        Start building a new recommender in a background thread.
+
+        Args:
+            data_path (str): Dataset to build from; defaults to the current path
+
+        Returns:
+            bool: True if a build was started, False if one is already running
+        """
+        if data_path is not None:
+            self.data_path = data_path
+        return self._start(self._build, self.data_path)
+
+    def check_source(self):
+        """
+        Start a background reload if the dataset file changed.
+
+        Cheap when nothing changed: the served model's source is only
+        stat'ed unless its mtime or size moved.
+
+        Returns:
+            bool: True if a reload was started
+        """
+        recommender = self.recommender
+        if recommender is None or self.status()['building'] or not recommender.source_changed():
+            return False
+        return self._start(self._build, self.data_path, recommender)
+
+    def watch(self, interval=5.0):
+        """
+        Poll the dataset file in a background thread and reload on changes.
+
+        Args:
+            interval (float): Seconds between checks
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+
+        def poll():
+            while not self._stop_watching.wait(interval):
+                self.check_source()
+
+        self._watcher = threading.Thread(target=poll, name='source-watch', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+
+    def _start(self, target, *args):
+        with self._lock:
+            if self._status['building']:
+                return False
+            self._status['building'] = True
+            self._status['build_started'] = time.time()
+            self._thread = threading.Thread(target=target, args=args, name='model-build', daemon=True)
+            self._thread.start()
+        return True
+
+    def wait(self, timeout=None):
+        """
+        Wait for the running build, if any, to finish.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if no build is running anymore
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.status()['building']
+
+    def _load_artifact(self, data_path):
+        """Load the saved model if it was built from the current dataset file."""
+        if self.artifact_path is None or not os.path.exists(os.path.join(self.artifact_path, 'model.pkl')):
+            return None
+        recommender = NetflixRecommender.load(self.artifact_path)
+        source = getattr(recommender, 'source', None)
+        if source is None or os.path.abspath(source.path) != os.path.abspath(data_path) or source.changed():
+            print("Saved model is out of date; rebuilding")
+            return None
+        return recommender
+
+    def _save_artifact(self, recommender):
+        """
+        Save a model over the artifact without touching the files in place.
+
+        The served model may memory-map the current files, so the new ones
+        are written to a sibling directory and renamed into place; open maps
+        keep the old, unlinked files.
+        """
+        staging, retired = self.artifact_path + '.new', self.artifact_path + '.old'
+        for path in (staging, retired):
+            shutil.rmtree(path, ignore_errors=True)
+        recommender.save(staging)
+        if os.path.exists(self.artifact_path):
+            os.rename(self.artifact_path, retired)
+        os.rename(staging, self.artifact_path)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def _build(self, data_path, previous=None):
+        start = time.perf_counter()
+        recommender, mode, changes, error, warmup_seconds = None, 'full', None, None, None
+        try:
+            if previous is None:
+                recommender = self._load_artifact(data_path)
+            if recommender is not None:
+                mode = 'artifact'
+            else:
+                recommender = NetflixRecommender(data_path)
+                if recommender.df is None:
+                    raise FileNotFoundError(f"Dataset not found at {data_path}")
+                if previous is not None:
+                    changes = diff_rows(previous.df, recommender.df, self.key)
+                    if changes is not None and changes['changed_fraction'] <= self.incremental_threshold:
+                        mode = 'incremental'
+                if mode == 'incremental':
+                    recommender.build_incremental(previous, **self.build_options)
+                else:
+                    recommender.build_model(**self.build_options)
+                if self.artifact_path is not None:
+                    self._save_artifact(recommender)
+            if self.warm_up is not None:
+                # Only one build runs at a time, so this is the version it will get
+                warmup_start = time.perf_counter()
+                self.warm_up(recommender, self.version + 1)
+                warmup_seconds = time.perf_counter() - warmup_start
+        except Exception as exc:
+            recommender = None
+            error = f"{type(exc).__name__}: {exc}"
+            print(f"Error: Model build failed: {error}")
+            if previous is not None:
+                # Do not retry until the file changes again
+                previous.source.refresh()
+
+        with self._lock:
+            if recommender is not None:
+                self._recommender = recommender
+                self._version += 1
+            self._status.update(
+                building=False,
+                build_finished=time.time(),
+                build_seconds=time.perf_counter() - start,
+                build_mode=mode,
+                changes=changes,
+                warmup_seconds=warmup_seconds,
+                error=error,
+            )
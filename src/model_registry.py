@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+from recommendation_engine import NetflixRecommender
+
+# Catalog id of the full, unsplit catalog
+ALL_CATALOGS = 'all'
+
+
+class _Entry:
+    """A built catalog model with its size and the requests using it."""
+
+    __slots__ = ('recommender', 'nbytes', 'base_version', 'refs')
+
+    def __init__(self, recommender, nbytes, base_version):
+        self.recommender = recommender
+        self.nbytes = nbytes
+        self.base_version = base_version
+        self.refs = 0
+
+
+class ModelRegistry:
+    """
+    Serve per-region catalogs split off a full model, within a memory budget.
+
+    Catalog ids are the values of split_field (a list field such as country,
+    where a title listed for several countries belongs to each of their
+    catalogs) plus ALL_CATALOGS for the full model itself. Regional models
+    are built on first use from the full model's rows and reuse its fitted
+    vectorizer, so every catalog shares one vocabulary and a title has the
+    same vector in each catalog it appears in.
+
+    Models are held in least-recently-used order. When their total size
+    exceeds max_memory_bytes the least recently used models are evicted,
+    except those acquired by a request still in flight; they are evicted
+    once released, if the registry is still over budget then.
+    """
+
+    def __init__(self, max_memory_bytes=512 * 1024 * 1024, split_field='country', build_options=None):
+        """
+        Initialize the registry. Nothing is built until a catalog is acquired.
+
+        Args:
+            max_memory_bytes (int): Budget for the regional models; the full
+                model is not counted
+            split_field (str): List field whose values identify the catalogs
+            build_options (dict): Keyword arguments passed to build_model
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.split_field = split_field
+        self.build_options = dict(build_options or {})
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._entries = OrderedDict()
+        self._base = None
+        self._base_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def use_base(self, recommender, version):
+        """
+        Set the full model catalogs are split from.
+
+        Cheap when the version is unchanged. A new version drops the models
+        built from the old one, once no request is using them.
+
+        Args:
+            recommender (NetflixRecommender): Built full model
+            version (int): Its version, e.g. from ModelManager.snapshot()
+        """
+        with self._lock:
+            if version == self._base_version:
+                return
+            self._base, self._base_version = recommender, version
+            for catalog_id in [key for key, entry in self._entries.items() if entry.refs == 0]:
+                del self._entries[catalog_id]
+
+    def catalog_ids(self):
+        """
+        List the catalogs that can be acquired.
+
+        Returns:
+            list: ALL_CATALOGS, then the split field values by title count
+        """
+        base = self._base
+        if base is None:
+            return []
+        if not base.filter_masks:
+            base.build_filter_masks()
+        masks = base.filter_masks.get(self.split_field, {})
+        sizes = {value: int(np.unpackbits(mask).sum()) for value, mask in masks.items()}
+        return [ALL_CATALOGS] + sorted(sizes, key=lambda value: (-sizes[value], str(value)))
+
+    @property
+    def memory_bytes(self):
+        """Estimated bytes held by the regional models."""
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def stats(self):
+        """
+        Report the models held and the cache counters.
+
+        Returns:
+            dict: models (catalog id to bytes and refs), memory_bytes,
+            max_memory_bytes, hits, misses and evictions
+        """
+        with self._lock:
+            models = {key: {'bytes': entry.nbytes, 'refs': entry.refs} for key, entry in self._entries.items()}
+            return {
+                'models': models,
+                'memory_bytes': sum(model['bytes'] for model in models.values()),
+                'max_memory_bytes': self.max_memory_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    @contextmanager
+    def acquire(self, catalog_id):
+        """
+        Use the model of a catalog for the duration of a request.
+
+        The model is built on first use; while acquired it is never evicted.
+
+        Args:
+            catalog_id (str): ALL_CATALOGS or a split field value
+
+        Yields:
+            NetflixRecommender: Model of the catalog
+        """
+        with self._lock:
+            base, base_version = self._base, self._base_version
+        if base is None:
+            raise ValueError("No base model set. Call use_base() first.")
+        if catalog_id == ALL_CATALOGS:
+            yield base
+            return
+
+        entry = self._checkout(catalog_id, base, base_version)
+        try:
+            yield entry.recommender
+        finally:
+            with self._lock:
+                entry.refs -= 1
+                if entry.base_version != self._base_version and entry.refs == 0:
+                    if self._entries.get(catalog_id) is entry:
+                        del self._entries[catalog_id]
+                self._evict()
+
+    def _checkout(self, catalog_id, base, base_version):
+        with self._lock:
+            entry = self._entries.get(catalog_id)
+            if entry is not None and entry.base_version == base_version:
+                self._entries.move_to_end(catalog_id)
+                entry.refs += 1
+                self.hits += 1
+                return entry
+            build_lock = self._build_locks.setdefault(catalog_id, threading.Lock())
+
+        # One build per catalog at a time; requests for it wait and share it
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(catalog_id)
+                if entry is not None and entry.base_version == base_version:
+                    self._entries.move_to_end(catalog_id)
+                    entry.refs += 1
+                    self.hits += 1
+                    return entry
+                self.misses += 1
+            entry = self._build(catalog_id, base, base_version)
+            with self._lock:
+                # A stale entry still in use is dropped from the registry; its
+                # holders keep their reference until they release it
+                entry.refs += 1
+                self._entries[catalog_id] = entry
+                self._entries.move_to_end(catalog_id)
+                self._evict()
+        return entry
+
+    def _build(self, catalog_id, base, base_version):
+        mask = base.filter_mask({self.split_field: catalog_id})
+        if mask is None or not mask.any():
+            raise ValueError(f"Unknown catalog '{catalog_id}'")
+
+        print(f"\n--- Building Catalog '{catalog_id}' ---")
+        start = time.perf_counter()
+        recommender = NetflixRecommender.from_dataframe(base.df[mask])
+        recommender.build_model(vectorizer=base.tfidf_vectorizer, **self.build_options)
+        nbytes = recommender.memory_usage()['total']
+        print(f"Catalog '{catalog_id}': {int(mask.sum())} titles, {nbytes / 1024 / 1024:.1f} MB, "
+              f"built in {time.perf_counter() - start:.2f}s")
+        return _Entry(recommender, nbytes, base_version)
+
+    def _evict(self):
+        """Drop least recently used, unreferenced models until within budget."""
+        total = sum(entry.nbytes for entry in self._entries.values())
+        for catalog_id in list(self._entries):
+            if total <= self.max_memory_bytes:
+                break
+            entry = self._entries[catalog_id]
+            if entry.refs == 0:
+                del self._entries[catalog_id]
+                total -= entry.nbytes
+                self.evictions += 1
+                print(f"Evicted catalog '{catalog_id}' ({entry.nbytes / 1024 / 1024:.1f} MB)")
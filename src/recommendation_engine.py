@@ -1,15 +1,276 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 import nltk
 from nltk.corpus import stopwords
 import re
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+import tracemalloc
 import warnings
+from contextlib import contextmanager
+from functools import lru_cache
+from catalog_store import CatalogStore
+from results import RecommendationResult
+from source_watch import SourceTracker
+from title_search import TitleSearchIndex
 warnings.filterwarnings('ignore')
 
 nltk.download('stopwords', quiet=True)
 
+# Standardized columns returned with every recommendation
+OUTPUT_COLUMNS = ['title', 'type', 'listed_in', 'description', 'release_year', 'poster_url']
+
+# Standardized fields and the raw columns they can be read from, in order of
+# preference, with the value used when a field or entry is missing
+SCHEMA_MAPPING = {
+    'listed_in': {'sources': ['Genre', 'listed_in'], 'default': 'Unknown'},
+    'cast': {'sources': ['Actors', 'cast'], 'default': 'Unknown'},
+    'director': {'sources': ['Director', 'director'], 'default': 'Unknown'},
+    'description': {'sources': ['Summary', 'description'], 'default': 'Unknown'},
+    'title': {'sources': ['title', 'Title'], 'default': 'Unknown'},
+    'release_year': {'sources': ['release_year', 'Release Date'], 'default': 2020, 'dtype': int},
+    'type': {'sources': ['type', 'Series or Movie'], 'default': 'Unknown'},
+    'poster_url': {'sources': ['poster_url', 'Image'], 'default': ''},
+    'country': {'sources': ['Country Availability', 'country'], 'default': 'Unknown'},
+    'rating': {'sources': ['View Rating', 'rating'], 'default': 'Unknown'},
+}
+
+# Candidate pool size, as a multiple of the requested count, for diversity re-ranking
+DIVERSITY_POOL_FACTOR = 10
+
+# Pairwise similarity at or above which two candidates count as duplicates
+DUPLICATE_SIMILARITY = 0.999
+
+# Fields with precomputed filter masks; list fields hold comma-separated values
+FILTER_FIELDS = {
+    'type': False,
+    'release_year': False,
+    'country': True,
+    'rating': False,
+}
+
+# Bump when clean_text changes so persistent token caches are invalidated
+CLEAN_TEXT_VERSION = 'clean_text-1'
+
+# Relative weight of each field when features are built per field instead of
+# from a single metadata soup
+DEFAULT_FIELD_WEIGHTS = {
+    'listed_in': 1.0,
+    'cast': 0.5,
+    'director': 0.5,
+    'description': 1.0,
+}
+
+# Fields holding comma-separated names or genres, vectorized as exact tokens
+LIST_FIELDS = ['listed_in', 'cast', 'director']
+
+# Arrays saved as .npy files next to the pickled model state, so load can
+# memory-map them instead of reading them into memory
+ARTIFACT_ARRAYS = ['soup_index', 'similarity_matrix', 'neighbor_ids', 'neighbor_scores']
+
+# Files holding the TF-IDF matrix's CSR buffers in a saved model
+TFIDF_ARRAYS = ['tfidf_data', 'tfidf_indices', 'tfidf_indptr']
+
+# Conversions applied when a field is read from a raw column of a different format
+SCHEMA_CONVERTERS = {
+    'Release Date': lambda values: pd.to_datetime(values, errors='coerce').dt.year,
+}
+
+
+@lru_cache(maxsize=1)
+def _stop_words():
+    """Load the English stopword set once."""
+    return frozenset(stopwords.words('english'))
+
+
+def _split_list_field(text):
+    """Tokenize a comma-separated field into whole lowercase entries."""
+    return [item.strip().lower() for item in text.split(',') if item.strip()]
+
+
+def _count_terms(docs, doc_counts):
+    """
+    Count the unigrams and bigrams of distinct documents that each stand for several rows.
+    
+    Args:
+        docs (list): Distinct cleaned documents
+        doc_counts (np.ndarray): Number of rows sharing each document
+        
+    Returns:
+        tuple: (count matrix of docs, sorted terms, document frequencies and
+        term frequencies of the terms, weighted by doc_counts)
+    """
+    doc_counts = np.asarray(doc_counts, dtype=np.int64)
+    counter = CountVectorizer(stop_words='english', ngram_range=(1, 2))
+    counts = counter.fit_transform(docs).tocsr()
+    terms = counter.get_feature_names_out()
+    
+    entry_weights = np.repeat(doc_counts, np.diff(counts.indptr))
+    doc_freq = np.bincount(counts.indices, weights=entry_weights, minlength=len(terms)).astype(np.int64)
+    term_freq = np.bincount(counts.indices, weights=counts.data * entry_weights, minlength=len(terms)).astype(np.int64)
+    return counts, terms, doc_freq, term_freq
+
+
+def _select_terms(terms, doc_freq, term_freq, num_docs, max_features=5000, min_df=2, max_df=0.8):
+    """
+    Prune counted terms into a TF-IDF vocabulary and fit its idf weights.
+    
+    Args:
+        terms (np.ndarray): Sorted terms
+        doc_freq (np.ndarray): Weighted document frequency of each term
+        term_freq (np.ndarray): Weighted term frequency of each term
+        num_docs (int): Number of rows counted
+        max_features (int): Maximum vocabulary size
+        min_df (int): Minimum weighted document frequency of a term
+        max_df (float): Maximum document frequency as a fraction of all rows
+        
+    Returns:
+        tuple: (fitted TfidfVectorizer, positions of the kept terms in terms)
+    """
+    keep = (doc_freq >= min_df) & (doc_freq <= max_df * num_docs)
+    keep_indices = np.flatnonzero(keep)
+    if max_features is not None and len(keep_indices) > max_features:
+        keep_indices = np.sort(keep_indices[(-term_freq[keep_indices]).argsort()[:max_features]])
+    if len(keep_indices) == 0:
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    
+    vectorizer = TfidfVectorizer(
+        vocabulary={term: i for i, term in enumerate(terms[keep_indices])},
+        stop_words='english',
+        ngram_range=(1, 2)
+    )
+    vectorizer.idf_ = np.log((1 + num_docs) / (1 + doc_freq[keep_indices])) + 1
+    return vectorizer, keep_indices
+
+
+def _fit_weighted_tfidf(docs, doc_counts, max_features=5000, min_df=2, max_df=0.8):
+    """
+    Fit TF-IDF on distinct documents that each stand for several rows.
+    
+    Document frequencies, the max_features ranking and the idf weights are
+    computed as if every document appeared doc_counts times, so the
+    vocabulary and vectors match fitting a TfidfVectorizer on the full,
+    duplicated corpus.
+    
+    Args:
+        docs (list): Distinct cleaned documents
+        doc_counts (np.ndarray): Number of rows sharing each document
+        max_features (int): Maximum vocabulary size
+        min_df (int): Minimum weighted document frequency of a term
+        max_df (float): Maximum document frequency as a fraction of all rows
+        
+    Returns:
+        tuple: (fitted TfidfVectorizer, L2-normalized TF-IDF matrix of docs)
+    """
+    counts, terms, doc_freq, term_freq = _count_terms(docs, doc_counts)
+    vectorizer, keep_indices = _select_terms(terms, doc_freq, term_freq, int(np.sum(doc_counts)),
+                                             max_features, min_df, max_df)
+    
+    # Weight with a TfidfTransformer, as vectorizer.transform does, so rows
+    # vectorized later with the shared vectorizer match these bit for bit
+    kept_counts = counts[:, keep_indices].tocsr().astype(np.float64)
+    kept_counts.sort_indices()
+    transformer = TfidfTransformer()
+    transformer.idf_ = vectorizer.idf_
+    return vectorizer, transformer.transform(kept_counts)
+
+
+def _neighbors_for_block(tfidf_matrix, transposed, soup_index, start, stop, width):
+    """
+    Compute the top neighbors of a block of distinct soups.
+    
+    Multiplies the block's feature rows by the transpose of the full matrix,
+    expands the scores to catalog rows and keeps the best width rows per soup.
+    The selection runs on the whole block at once, so it stays in numpy and
+    threads working on other blocks are not held up. As in _top_k, ties are
+    broken by lower row id.
+    
+    Args:
+        tfidf_matrix (scipy.sparse.csr_matrix): L2-normalized soup vectors
+        transposed (scipy.sparse.csr_matrix): tfidf_matrix.T in CSR format
+        soup_index (np.ndarray): Soup of every catalog row
+        start (int): First soup of the block
+        stop (int): One past the last soup of the block
+        width (int): Neighbors to keep per soup
+        
+    Returns:
+        tuple: (int32 row ids, float32 scores), each of shape (stop - start, width)
+    """
+    row_scores = (tfidf_matrix[start:stop] @ transposed).toarray()[:, soup_index]
+    num_items = row_scores.shape[1]
+    # Score of each soup's width-th best row
+    threshold = np.partition(row_scores, num_items - width, axis=1)[:, [num_items - width]]
+    selected = row_scores > threshold
+    # Fill the remaining places with the lowest row ids tied at the threshold
+    ties = row_scores == threshold
+    needed = width - selected.sum(axis=1, keepdims=True)
+    selected |= ties & (np.cumsum(ties, axis=1, dtype=np.int32) <= needed)
+    
+    ids = np.nonzero(selected)[1].reshape(stop - start, width)
+    scores = np.take_along_axis(row_scores, ids, axis=1)
+    order = np.argsort(-scores, axis=1, kind='stable')
+    return (np.take_along_axis(ids, order, axis=1).astype(np.int32),
+            np.take_along_axis(scores, order, axis=1).astype(np.float32))
+
+
+@contextmanager
+def _track_stage(stats, stage, measure_memory=False):
+    """
+    Record the wall time and, optionally, the peak traced memory of a build stage.
+    
+    Args:
+        stats (dict): build_stats dictionary to record into
+        stage (str): Stage name
+        measure_memory (bool): Trace allocations with tracemalloc during the stage
+    """
+    started_tracing = measure_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif measure_memory:
+        tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0] if measure_memory else 0
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.setdefault('timings', {})[stage] = time.perf_counter() - start
+        if measure_memory:
+            stats.setdefault('peak_memory', {})[stage] = tracemalloc.get_traced_memory()[1] - baseline
+            if started_tracing:
+                tracemalloc.stop()
+
+
+def _top_k(scores, k):
+    """
+    Return the indices of the k highest scores, best first.
+
+    Uses argpartition so only the selected candidates are sorted. Ties are
+    broken by lower index first so results are deterministic.
+
+    Args:
+        scores (np.ndarray): 1-D array of scores
+        k (int): Number of indices to return
+
+    Returns:
+        np.ndarray: Indices of the top k scores
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        kth_score = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        candidates = np.flatnonzero(scores >= kth_score)
+    else:
+        candidates = np.arange(len(scores))
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
 
 class NetflixRecommender:
     def __init__(self, data_path):
@@ -17,16 +278,52 @@ class NetflixRecommender:
         Initialize the Netflix Recommender system.
         
         Args:
-            data_path (str): Path to the Netflix dataset CSV file
+            data_path (str): Path to the Netflix dataset CSV file, or None to
+                start without data (see from_dataframe)
         """
         self.df = None
         self.tfidf_vectorizer = None
         self.tfidf_matrix = None
+        self.soup_index = None
+        self.metadata_soups = None
+        self.field_vectorizers = {}
+        self.field_matrices = {}
+        self.field_weights = None
         self.similarity_matrix = None
-        self.load_data(data_path)
+        self.similarity_options = {}
+        self.filter_masks = {}
+        self.neighbor_ids = None
+        self.neighbor_scores = None
+        self.neighbor_k = 0
+        self.catalog = None
+        self.title_index = None
+        self.title_rows = None
+        self.schema = {}
+        self._missing_values = None
+        self.build_stats = {}
+        self.source = None
+        if data_path is not None:
+            self.load_data(data_path)
+    
+    @classmethod
+    def from_dataframe(cls, df):
+        """
+        Create a recommender over an already loaded dataset.
+        
+        Args:
+            df (pd.DataFrame): Raw dataset rows, in the CSV's column layout
+            
+        Returns:
+            NetflixRecommender: Recommender holding the rows, not yet built
+        """
+        recommender = cls(None)
+        recommender.df = df.reset_index(drop=True)
+        return recommender
         
     def load_data(self, data_path):
         """Load and display basic information about the dataset."""
+        # Fingerprint before reading, so edits made during the load are still detected
+        self.source = SourceTracker(data_path)
         try:
             # Try UTF-8 first, fallback to latin-1 if encoding error
             try:
@@ -39,6 +336,18 @@ class NetflixRecommender:
             print(f"Columns: {self.df.columns.tolist()}")
         except FileNotFoundError:
             print(f"Error: Dataset not found at {data_path}")
+    
+    def source_changed(self):
+        """
+        Check whether the dataset file changed since it was loaded.
+        
+        Only stats the file unless its mtime or size changed, so it is cheap
+        enough to call on every request.
+        
+        Returns:
+            bool: True if the file content differs from the loaded version
+        """
+        return self.source is not None and self.source.changed()
             
     def clean_text(self, text):
         """
@@ -56,222 +365,901 @@ class NetflixRecommender:
         text = str(text).lower()
         text = re.sub(r'[^a-zA-Z\s]', ' ', text)
         
-        stop_words = set(stopwords.words('english'))
+        stop_words = _stop_words()
         words = text.split()
         words = [word for word in words if word not in stop_words and len(word) > 2]
         
         return ' '.join(words)
     
-    def preprocess_data(self):
+    def _field(self, name):
         """
-        Preprocess the dataset by handling missing values and combining features.
+        Get a standardized field, resolved through the schema and filled.
+        
+        The returned Series is built on demand from the mapped source column,
+        so no standardized copy is kept on the DataFrame.
+        
+        Args:
+            name (str): Standardized field name from SCHEMA_MAPPING
+            
+        Returns:
+            pd.Series: Field values with missing entries filled
+        """
+        spec = SCHEMA_MAPPING[name]
+        source = self.schema.get(name)
+        if source is None:
+            values = pd.Series(spec['default'], index=self.df.index)
+        else:
+            values = self.df[source]
+            if source in SCHEMA_CONVERTERS:
+                values = SCHEMA_CONVERTERS[source](values)
+            values = values.fillna(spec['default'])
+        if 'dtype' in spec:
+            values = values.astype(spec['dtype'])
+        return values
+    
+    def missing_values_report(self):
+        """
+        Count missing values per raw column.
+        
+        Computed on first call and cached, since it scans the whole frame.
+        
+        Returns:
+            pd.Series: Number of missing values per column
+        """
+        if self._missing_values is None:
+            self._missing_values = self.df.isnull().sum()
+        return self._missing_values
+    
+    def preprocess_data(self, diagnostics=False):
+        """
+        Preprocess the dataset by mapping raw columns onto standardized fields.
+        
+        Each standardized field is aliased to the first source column from
+        SCHEMA_MAPPING present in the dataset; nothing is copied. Missing
+        values are filled when a field is read.
+        
+        Args:
+            diagnostics (bool): Print the schema mapping and missing value counts
         """
         print("\n--- Data Preprocessing ---")
         
-        print(f"Initial missing values:\n{self.df.isnull().sum()}")
+        self.schema = {}
+        for name, spec in SCHEMA_MAPPING.items():
+            self.schema[name] = next((col for col in spec['sources'] if col in self.df.columns), None)
         
-        # Handle different column names based on dataset
-        if 'Genre' in self.df.columns:
-            self.df['listed_in'] = self.df['Genre'].fillna('Unknown')
-        elif 'listed_in' not in self.df.columns:
-            self.df['listed_in'] = 'Unknown'
-        else:
-            self.df['listed_in'] = self.df['listed_in'].fillna('Unknown')
+        if diagnostics:
+            print(f"Schema mapping: {self.schema}")
+            print(f"Missing values:\n{self.missing_values_report()}")
         
-        if 'Actors' in self.df.columns:
-            self.df['cast'] = self.df['Actors'].fillna('Unknown')
-        elif 'cast' not in self.df.columns:
-            self.df['cast'] = 'Unknown'
-        else:
-            self.df['cast'] = self.df['cast'].fillna('Unknown')
+        fields = {name: self._field(name) for name in OUTPUT_COLUMNS}
+        self.catalog = CatalogStore.from_columns(fields)
+        report = self.catalog.memory_report(fields, frame=self.df)
+        print(f"Catalog store: {report['catalog_bytes'] / 1024:.1f} KB "
+              f"vs {report['dataframe_bytes'] / 1024:.1f} KB as DataFrame columns")
+        print(f"Raw DataFrame plus catalog: {report['total_bytes'] / 1024:.1f} KB "
+              f"vs {report['baseline_bytes'] / 1024:.1f} KB with the columns in the DataFrame "
+              f"({report['ratio']:.0%})")
         
-        if 'Director' in self.df.columns:
-            self.df['director'] = self.df['Director'].fillna('Unknown')
-        elif 'director' not in self.df.columns:
-            self.df['director'] = 'Unknown'
-        else:
-            self.df['director'] = self.df['director'].fillna('Unknown')
+    def _clean_texts(self, texts, token_cache=None):
+        """
+        Clean several texts, reusing cached results where possible.
         
-        if 'Summary' in self.df.columns:
-            self.df['description'] = self.df['Summary'].fillna('Unknown')
-        elif 'description' not in self.df.columns:
-            self.df['description'] = 'Unknown'
-        else:
-            self.df['description'] = self.df['description'].fillna('Unknown')
+        Args:
+            texts (list): Raw texts
+            token_cache (TokenCache): Optional persistent cache of cleaned text
+            
+        Returns:
+            list: Cleaned texts in input order
+        """
+        if token_cache is None:
+            return [self.clean_text(text) for text in texts]
         
-        # Handle title
-        if 'Title' in self.df.columns and 'title' not in self.df.columns:
-            self.df['title'] = self.df['Title']
-        elif 'title' not in self.df.columns:
-            self.df['title'] = 'Unknown'
+        keys = [token_cache.key(f"{CLEAN_TEXT_VERSION}\x00{text}") for text in texts]
+        cached = token_cache.get_many(keys)
+        cleaned = []
+        new_entries = {}
+        for key, text in zip(keys, texts):
+            value = cached.get(key)
+            if value is None:
+                value = self.clean_text(text)
+                new_entries[key] = value
+            cleaned.append(value)
+        token_cache.put_many(new_entries)
+        return cleaned
+    
+    def _raw_soups(self):
+        """
+        Join genre, cast, director and description into one raw string per row.
         
-        # Handle release year
-        if 'Release Date' in self.df.columns and 'release_year' not in self.df.columns:
-            try:
-                self.df['release_year'] = pd.to_datetime(self.df['Release Date'], errors='coerce').dt.year
-                self.df['release_year'] = self.df['release_year'].fillna(2020).astype(int)
-            except:
-                self.df['release_year'] = 2020
-        elif 'release_year' not in self.df.columns:
-            self.df['release_year'] = 2020
-        
-        # Handle type
-        if 'Series or Movie' in self.df.columns and 'type' not in self.df.columns:
-            self.df['type'] = self.df['Series or Movie']
-        elif 'type' not in self.df.columns:
-            self.df['type'] = 'Unknown'
-        
-        # Handle poster URL
-        if 'Image' in self.df.columns and 'poster_url' not in self.df.columns:
-            self.df['poster_url'] = self.df['Image'].fillna('')
-        elif 'poster_url' not in self.df.columns:
-            self.df['poster_url'] = ''
-        
-        print("\nAfter filling missing values:")
-        print(f"Missing values:\n{self.df.isnull().sum()}")
-        
-    def create_metadata_soup(self):
+        Returns:
+            pd.Series: Uncleaned metadata soup of every row
+        """
+        return (
+            self._field('listed_in') + ' ' +
+            self._field('cast') + ' ' +
+            self._field('director') + ' ' +
+            self._field('description')
+        )
+    
+    def create_metadata_soup(self, token_cache=None):
         """
         Create a 'metadata soup' by combining relevant features.
         This combines genre, cast, director, and description into a single string.
+        
+        Rows with byte-identical soups are collapsed: only the distinct soups
+        are cleaned and kept in metadata_soups, and soup_index maps every row
+        to its soup.
+        
+        Args:
+            token_cache (TokenCache): Optional persistent cache mapping a hash
+                of the raw genre/cast/director/description soup to its cleaned
+                text, so unchanged rows are not cleaned again
         """
         print("\n--- Feature Engineering ---")
         print("Creating metadata soup from: genre, cast, director, and description")
         
-        self.df['metadata_soup'] = (
-            self.df['listed_in'].fillna('') + ' ' +
-            self.df['cast'].fillna('') + ' ' +
-            self.df['director'].fillna('') + ' ' +
-            self.df['description'].fillna('')
-        )
+        codes, uniques = pd.factorize(self._raw_soups())
+        self.soup_index = codes.astype(np.int32)
+        print(f"Collapsed {len(codes)} rows into {len(uniques)} distinct soups")
+        self.build_stats['unique_soups'] = len(uniques)
         
         print("Cleaning metadata soup...")
-        self.df['metadata_soup'] = self.df['metadata_soup'].apply(self.clean_text)
+        self.metadata_soups = self._clean_texts(uniques, token_cache)
         
-        print(f"Sample metadata soup:\n{self.df['metadata_soup'].iloc[0][:200]}...")
+        print(f"Sample metadata soup:\n{self.metadata_soups[self.soup_index[0]][:200]}...")
         
     def vectorize_features(self, max_features=5000):
         """
         Convert text data to TF-IDF vectors.
         
+        One vector is computed per distinct soup, weighted by how many rows
+        share it, so the vocabulary and idf match vectorizing every row.
+        tfidf_matrix holds one row per distinct soup; use item_vectors to get
+        the vectors of catalog rows.
+        
         Args:
             max_features (int): Maximum number of features to use
         """
         print(f"\n--- TF-IDF Vectorization ---")
         print(f"Vectorizing with max_features={max_features}")
         
-        self.tfidf_vectorizer = TfidfVectorizer(
+        doc_counts = np.bincount(self.soup_index, minlength=len(self.metadata_soups))
+        self.tfidf_vectorizer, self.tfidf_matrix = _fit_weighted_tfidf(
+            self.metadata_soups,
+            doc_counts,
+            max_features=max_features,
+            min_df=2,
+            max_df=0.8
+        )
+        print(f"TF-IDF matrix shape: {self.tfidf_matrix.shape}")
+    
+    def term_stats(self):
+        """
+        Count the terms of the metadata soups without vectorizing them.
+        
+        Counts are weighted by the rows sharing each soup, so the stats of
+        several recommenders can be merged with fit_shared_vectorizer into
+        the vectorizer vectorize_features would fit on all their rows, e.g.
+        the shards of a ShardedRecommender.
+        
+        Returns:
+            dict: Sorted 'terms' with their 'doc_freq' and 'term_freq', and
+            'num_docs', the number of rows counted
+        """
+        doc_counts = np.bincount(self.soup_index, minlength=len(self.metadata_soups))
+        try:
+            _, terms, doc_freq, term_freq = _count_terms(self.metadata_soups, doc_counts)
+        except ValueError:
+            # No soup has a term outside the stop words
+            terms, doc_freq, term_freq = np.array([], dtype=object), np.zeros(0, np.int64), np.zeros(0, np.int64)
+        return {'terms': terms, 'doc_freq': doc_freq, 'term_freq': term_freq, 'num_docs': int(doc_counts.sum())}
+    
+    @staticmethod
+    def fit_shared_vectorizer(stats, max_features=5000):
+        """
+        Fit one vectorizer from the term_stats of several recommenders.
+        
+        Args:
+            stats (list): term_stats() of each recommender
+            max_features (int): Maximum number of features to use
+            
+        Returns:
+            TfidfVectorizer: Vectorizer with the vocabulary and idf weights
+            vectorize_features would fit on all their rows together
+        """
+        terms, positions = np.unique(np.concatenate([part['terms'] for part in stats]), return_inverse=True)
+        doc_freq, term_freq = (
+            np.bincount(positions, weights=np.concatenate([part[name] for part in stats]),
+                        minlength=len(terms)).astype(np.int64)
+            for name in ('doc_freq', 'term_freq')
+        )
+        num_docs = sum(part['num_docs'] for part in stats)
+        vectorizer, _ = _select_terms(terms, doc_freq, term_freq, num_docs, max_features=max_features,
+                                      min_df=2, max_df=0.8)
+        return vectorizer
+    
+    def apply_vectorizer(self, vectorizer):
+        """
+        Vectorize the metadata soups with an already fitted vectorizer.
+        
+        Used when several recommenders must share one vocabulary, e.g. the
+        shards of a ShardedRecommender. Rows get exactly the vectors they
+        would have in the recommender the vectorizer was fitted on.
+        
+        Args:
+            vectorizer (TfidfVectorizer): Fitted vectorizer to reuse
+        """
+        self.tfidf_vectorizer = vectorizer
+        self.tfidf_matrix = vectorizer.transform(self.metadata_soups)
+        print(f"TF-IDF matrix shape: {self.tfidf_matrix.shape}")
+        
+    def vectorize_fields(self, max_features=5000, token_cache=None):
+        """
+        Vectorize each metadata field separately.
+        
+        Genre, cast and director are split on commas into exact-entry tokens
+        (so "Pedro Pascal" is one feature), and the description is cleaned
+        and TF-IDF vectorized. Each distinct field value is tokenized once.
+        The row-normalized matrices are kept in field_matrices so weights
+        can be changed later without re-tokenizing.
+        
+        Args:
+            max_features (int): Maximum number of description features
+            token_cache (TokenCache): Optional persistent cache of cleaned descriptions
+        """
+        print(f"\n--- Per-Field Vectorization ---")
+        
+        self.field_vectorizers = {}
+        self.field_matrices = {}
+        self.soup_index = np.arange(len(self.df), dtype=np.int32)
+        for field in LIST_FIELDS:
+            codes, uniques = pd.factorize(self._field(field))
+            vectorizer = CountVectorizer(tokenizer=_split_list_field, token_pattern=None, lowercase=False, binary=True)
+            try:
+                unique_matrix = vectorizer.fit_transform(uniques)
+            except ValueError:
+                # Field has no tokens at all
+                continue
+            self.field_vectorizers[field] = vectorizer
+            self.field_matrices[field] = normalize(unique_matrix.tocsr()[codes])
+            print(f"{field}: {len(uniques)} distinct values, {unique_matrix.shape[1]} tokens")
+        
+        codes, uniques = pd.factorize(self._field('description'))
+        cleaned = pd.Series(self._clean_texts(uniques, token_cache)).to_numpy()[codes]
+        vectorizer = TfidfVectorizer(
             max_features=max_features,
             stop_words='english',
             ngram_range=(1, 2),
             min_df=2,
             max_df=0.8
         )
+        self.field_vectorizers['description'] = vectorizer
+        self.field_matrices['description'] = vectorizer.fit_transform(cleaned)
+        print(f"description: {len(uniques)} distinct values, {self.field_matrices['description'].shape[1]} terms")
+    
+    def combine_field_matrices(self, field_weights=None):
+        """
+        Combine the cached per-field matrices into tfidf_matrix.
         
-        self.tfidf_matrix = self.tfidf_vectorizer.fit_transform(self.df['metadata_soup'])
-        print(f"TF-IDF matrix shape: {self.tfidf_matrix.shape}")
+        Each field block is scaled by the square root of its weight, so the
+        cosine similarity of two rows is the weighted average of their
+        per-field cosine similarities.
         
-    def compute_similarity(self):
-        """Compute cosine similarity matrix between all movies."""
+        Args:
+            field_weights (dict): Weight per field; missing fields get weight 0.
+                Defaults to DEFAULT_FIELD_WEIGHTS
+        """
+        self.field_weights = dict(field_weights or DEFAULT_FIELD_WEIGHTS)
+        blocks = [
+            self.field_matrices[field] * np.sqrt(weight)
+            for field, weight in self.field_weights.items()
+            if weight > 0 and field in self.field_matrices
+        ]
+        if not blocks:
+            print("Error: No field has a positive weight.")
+            return
+        self.tfidf_matrix = normalize(sparse.hstack(blocks, format='csr'))
+        print(f"Combined feature matrix shape: {self.tfidf_matrix.shape} with weights {self.field_weights}")
+    
+    def set_field_weights(self, field_weights):
+        """
+        Reweight the per-field features and refresh the similarity model.
+        
+        Reuses the cached field matrices, so nothing is re-tokenized.
+        
+        Args:
+            field_weights (dict): Weight per field
+        """
+        if not self.field_matrices:
+            print("Error: Field features not built. Run build_model(field_weights=...) first.")
+            return
+        
+        self.combine_field_matrices(field_weights)
+        self.compute_similarity(**self.similarity_options)
+        if self.neighbor_ids is not None and self.similarity_matrix is not None:
+            self.build_neighbor_table(self.neighbor_k)
+    
+    def release_metadata_soup(self):
+        """Drop the cleaned soups once they have been vectorized into tfidf_matrix."""
+        self.metadata_soups = None
+        
+    def compute_similarity(self, max_memory_bytes=None, top_k=20, n_jobs=1):
+        """
+        Compute cosine similarity matrix between all distinct soups.
+        
+        Rows sharing a soup share a similarity row; use item_similarity to
+        get the scores of a catalog row against every other row.
+        
+        With a memory budget the dense matrix is never materialized. Row
+        blocks of tfidf_matrix are multiplied by its transpose, only the
+        top_k neighbors of each row are kept in the neighbor table, and
+        larger queries score rows on demand with a sparse product.
+        
+        Args:
+            max_memory_bytes (int): Working memory budget for the blocked
+                computation; None computes the full dense matrix
+            top_k (int): Neighbors kept per title in blocked mode
+            n_jobs (int): Threads used for blocks in blocked mode
+            
+        Raises:
+            ValueError: If max_memory_bytes is below what the neighbor table,
+                transposed matrix and one single-row block need
+        """
         print(f"\n--- Computing Similarity Matrix ---")
-        self.similarity_matrix = cosine_similarity(self.tfidf_matrix)
-        print(f"Similarity matrix shape: {self.similarity_matrix.shape}")
+        self.similarity_options = {'max_memory_bytes': max_memory_bytes, 'top_k': top_k, 'n_jobs': n_jobs}
+        if max_memory_bytes is None:
+            self.similarity_matrix = cosine_similarity(self.tfidf_matrix)
+            print(f"Similarity matrix shape: {self.similarity_matrix.shape}")
+            return
+        
+        num_soups = self.tfidf_matrix.shape[0]
+        num_items = len(self.soup_index)
+        neighbor_k = max(0, min(top_k, num_items - 1))
+        width = min(neighbor_k + 1, num_items)
+        
+        # The neighbor table and the transposed matrix come out of the budget
+        # first. Each thread then holds the sparse product's workspace and,
+        # per block row, a dense row of soup scores plus the sparse product it
+        # came from (about 24 bytes per soup), then the row expanded to
+        # catalog rows with its partitioned copy or selection masks (about 16
+        # bytes per catalog row)
+        transposed = self.tfidf_matrix.T.tocsr()
+        fixed_bytes = (num_soups * width * (4 + 4) +
+                       transposed.data.nbytes + transposed.indices.nbytes + transposed.indptr.nbytes)
+        thread_overhead = 4 * 8 * num_soups + 24 * num_soups
+        row_bytes = 24 * num_soups + 16 * num_items
+        min_bytes = fixed_bytes + thread_overhead + row_bytes
+        if max_memory_bytes < min_bytes:
+            raise ValueError(
+                f"max_memory_bytes={max_memory_bytes} is below the {min_bytes} bytes "
+                f"({min_bytes / 1e6:.1f} MB) blocked similarity needs for {num_soups} soups "
+                f"and top_k={top_k}"
+            )
+        
+        self.similarity_matrix = None
+        self.neighbor_k = neighbor_k
+        self.neighbor_ids = np.empty((num_soups, width), dtype=np.int32)
+        self.neighbor_scores = np.empty((num_soups, width), dtype=np.float32)
+        n_jobs = int(max(1, min(n_jobs, (max_memory_bytes - fixed_bytes) // (thread_overhead + row_bytes))))
+        per_thread = (max_memory_bytes - fixed_bytes) // n_jobs - thread_overhead
+        block_rows = int(max(1, min(num_soups, per_thread // row_bytes)))
+        blocks = [(start, min(start + block_rows, num_soups)) for start in range(0, num_soups, block_rows)]
+        print(f"Blocked similarity: {len(blocks)} blocks of {block_rows} rows, "
+              f"budget {max_memory_bytes / 1e6:.1f} MB, {n_jobs} thread(s)")
+        
+        def run_blocks(thread_blocks):
+            for start, stop in thread_blocks:
+                ids, scores = _neighbors_for_block(self.tfidf_matrix, transposed, self.soup_index, start, stop, width)
+                self.neighbor_ids[start:stop] = ids
+                self.neighbor_scores[start:stop] = scores
+        
+        if n_jobs > 1:
+            # One task per thread, each walking its own share of the blocks
+            with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                list(pool.map(run_blocks, [blocks[i::n_jobs] for i in range(n_jobs)]))
+        else:
+            run_blocks(blocks)
+        print(f"Neighbor table shape: {self.neighbor_ids.shape} for {num_items} rows")
+    
+    def item_vectors(self, item_ids):
+        """
+        Get the feature vectors of catalog rows.
+        
+        Args:
+            item_ids (array-like): Catalog row ids
+            
+        Returns:
+            scipy.sparse.csr_matrix: One feature row per item
+        """
+        return self.tfidf_matrix[self.soup_index[item_ids]]
+    
+    def item_similarity(self, item_ids):
+        """
+        Get the similarity of catalog rows to every catalog row.
+        
+        Args:
+            item_ids (int or array-like): Catalog row id, or ids
+            
+        Returns:
+            np.ndarray: Scores of length N, or shape (len(item_ids), N)
+        """
+        soups = self.soup_index[item_ids]
+        if self.similarity_matrix is not None:
+            rows = self.similarity_matrix[soups]
+        elif np.ndim(soups) == 0:
+            rows = (self.tfidf_matrix[soups] @ self.tfidf_matrix.T).toarray()[0]
+        else:
+            rows = (self.tfidf_matrix[soups] @ self.tfidf_matrix.T).toarray()
+        return rows[..., self.soup_index]
+    
+    def vector_similarity(self, query_vector):
+        """
+        Get the similarity of a query vector to every catalog row.
+        
+        Args:
+            query_vector (sparse.csr_matrix): One normalized row in the
+                vectorizer's feature space
+            
+        Returns:
+            np.ndarray: Scores of length N
+        """
+        # A CSR matrix-vector product over the soups; multiplying by
+        # tfidf_matrix.T instead would convert the whole matrix on every call
+        return (self.tfidf_matrix @ query_vector.toarray()[0])[self.soup_index]
+    
+    def _top_neighbors(self, similarity_scores, num_recommendations, exclude, mask=None):
+        """
+        Select the most similar rows for a score vector, skipping the query row.
+        
+        Args:
+            similarity_scores (np.ndarray): Similarity of every row to the query
+            num_recommendations (int): Number of neighbors to return
+            exclude (int or np.ndarray): Row index or indices to skip
+            mask (np.ndarray): Optional boolean mask of allowed rows
+            
+        Returns:
+            np.ndarray: Row indices of the neighbors, most similar first
+        """
+        scores = np.nan_to_num(similarity_scores, nan=0.0).astype(np.float64, copy=True)
+        if mask is not None:
+            scores[~mask] = -np.inf
+        scores[exclude] = -np.inf
+        similar_indices = _top_k(scores, num_recommendations)
+        return similar_indices[np.isfinite(scores[similar_indices])]
+    
+    def build_neighbor_table(self, k=20):
+        """
+        Materialize the top-k neighbors of every title.
+        
+        Neighbor lists are computed once per distinct soup and shared by the
+        rows holding it. Each list keeps k + 1 entries so a row can drop
+        itself and still have k neighbors. neighbor_ids holds int32 row ids
+        and neighbor_scores the matching float32 similarity scores, so
+        get_recommendations can answer n <= k with a row slice.
+        
+        Args:
+            k (int): Number of neighbors to keep per title
+        """
+        if self.similarity_matrix is None:
+            print("Error: Similarity matrix not computed. Run compute_similarity() first.")
+            return
+        
+        print(f"\n--- Building Neighbor Table ---")
+        num_items = len(self.soup_index)
+        self.neighbor_k = max(0, min(k, num_items - 1))
+        width = min(self.neighbor_k + 1, num_items)
+        
+        num_soups = self.similarity_matrix.shape[0]
+        self.neighbor_ids = np.empty((num_soups, width), dtype=np.int32)
+        self.neighbor_scores = np.empty((num_soups, width), dtype=np.float32)
+        for soup in range(num_soups):
+            similarity_scores = self.similarity_matrix[soup][self.soup_index]
+            similar_indices = self._top_neighbors(similarity_scores, width, exclude=[])
+            self.neighbor_ids[soup] = similar_indices
+            self.neighbor_scores[soup] = similarity_scores[similar_indices]
+        
+        print(f"Neighbor table shape: {self.neighbor_ids.shape} for {num_items} rows")
+    
+    def _table_neighbors(self, item_id):
+        """
+        Read the precomputed neighbors of a row from the neighbor table.
+        
+        Args:
+            item_id (int): Catalog row id
+            
+        Returns:
+            tuple: (row ids, scores) of up to neighbor_k neighbors, best first
+        """
+        soup = self.soup_index[item_id]
+        ids = self.neighbor_ids[soup]
+        keep = ids != item_id
+        return ids[keep][:self.neighbor_k], self.neighbor_scores[soup][keep][:self.neighbor_k]
+    
+    def build_filter_masks(self):
+        """
+        Precompute packed bitset masks for the filterable fields.
+        
+        For every distinct value of type, release_year, country and rating a
+        bitset of the rows holding it is stored in filter_masks, so
+        filter_mask can combine them with bitwise operations at query time.
+        Comma-separated country lists set the bit for each listed country.
+        """
+        print(f"\n--- Building Filter Masks ---")
+        self.filter_masks = {}
+        for field, is_list in FILTER_FIELDS.items():
+            if self.schema.get(field) is None:
+                continue
+            values = self._field(field)
+            if is_list:
+                exploded = values.astype(str).str.split(',').explode().str.strip()
+                rows = exploded.index.to_numpy()
+                codes, uniques = pd.factorize(exploded.to_numpy())
+            else:
+                rows = np.arange(len(values))
+                codes, uniques = pd.factorize(values.to_numpy())
+            
+            field_masks = {}
+            for code, value in enumerate(uniques):
+                mask = np.zeros(len(values), dtype=bool)
+                mask[rows[codes == code]] = True
+                key = value.item() if hasattr(value, 'item') else value
+                field_masks[key] = np.packbits(mask)
+            self.filter_masks[field] = field_masks
+            print(f"{field}: {len(field_masks)} values")
+    
+    def filter_mask(self, filters):
+        """
+        Combine precomputed masks for a set of filters.
+        
+        A filter on a field the dataset has no column for matches no rows,
+        since no row is known to pass it.
+        
+        Args:
+            filters (dict): Any of 'type', 'country', 'rating' (a value or a
+                list of accepted values), 'min_year' and 'max_year'
+            
+        Returns:
+            np.ndarray: Boolean mask of the rows passing every filter, or None
+            when there are no filters
+            
+        Raises:
+            ValueError: If a filter name is not one of the above
+        """
+        if not filters:
+            return None
+        known = [field for field in FILTER_FIELDS if field != 'release_year'] + ['min_year', 'max_year']
+        unknown = [field for field in filters if field not in known]
+        if unknown:
+            raise ValueError(f"Unknown filter(s) {unknown}; use any of {known}")
+        if not self.filter_masks:
+            self.build_filter_masks()
         
-    def get_recommendations(self, title, num_recommendations=10):
+        num_items = len(self.catalog)
+        packed = np.packbits(np.ones(num_items, dtype=bool))
+        empty = np.zeros_like(packed)
+        for field, accepted in filters.items():
+            if field in ('min_year', 'max_year'):
+                low = accepted if field == 'min_year' else -np.inf
+                high = accepted if field == 'max_year' else np.inf
+                year_masks = self.filter_masks.get('release_year', {})
+                field_packed = empty.copy()
+                for year, year_mask in year_masks.items():
+                    if low <= year <= high:
+                        field_packed |= year_mask
+            else:
+                if isinstance(accepted, str) or not hasattr(accepted, '__iter__'):
+                    accepted = [accepted]
+                field_masks = self.filter_masks.get(field, {})
+                field_packed = empty.copy()
+                for value in accepted:
+                    field_packed |= field_masks.get(value, empty)
+            packed &= field_packed
+        return np.unpackbits(packed, count=num_items).astype(bool)
+    
+    def _rerank(self, indices, scores, num_recommendations, diversify, mmr_lambda=0.7, query_ids=None):
+        """
+        Re-rank a candidate pool for diversity.
+        
+        Pairwise similarities are computed among the candidates only, with
+        one sparse product over their feature rows. The rows the query
+        started from count as already kept: candidates sharing a title with
+        one of them or scoring at least DUPLICATE_SIMILARITY against one are
+        dropped, and MMR redundancy starts from the similarity to them.
+        
+        Args:
+            indices (np.ndarray): Candidate row ids, best first
+            scores (np.ndarray): Relevance score of each candidate
+            num_recommendations (int): Number of rows to keep
+            diversify (str): 'mmr' for maximal marginal relevance, or
+                'collapse' to drop duplicate titles and near-identical rows
+            mmr_lambda (float): MMR trade-off; 1.0 is pure relevance
+            query_ids (array-like): Row ids of the query title or watch
+                history, if the query started from catalog rows
+            
+        Returns:
+            tuple: (row indices, scores) of the kept candidates
+        """
+        indices = np.asarray(indices)
+        scores = np.asarray(scores, dtype=np.float64)
+        if len(indices) == 0:
+            return indices, scores
+        
+        candidate_vectors = self.item_vectors(indices)
+        query_similarity = np.zeros(len(indices))
+        if query_ids is not None and len(np.atleast_1d(query_ids)) > 0:
+            query_ids = np.atleast_1d(query_ids)
+            query_similarity = (candidate_vectors @ self.item_vectors(query_ids).T).toarray().max(axis=1)
+            query_titles = set(self.catalog.take('title', query_ids))
+            distinct = np.array([title not in query_titles for title in self.catalog.take('title', indices)])
+            distinct &= query_similarity < DUPLICATE_SIMILARITY
+            indices, scores, query_similarity = indices[distinct], scores[distinct], query_similarity[distinct]
+            candidate_vectors = candidate_vectors[np.flatnonzero(distinct)]
+        if len(indices) <= 1:
+            return indices, scores
+        
+        pairwise = (candidate_vectors @ candidate_vectors.T).toarray()
+        
+        if diversify == 'collapse':
+            titles = self.catalog.take('title', indices)
+            keep = []
+            for pos in range(len(indices)):
+                if len(keep) == num_recommendations:
+                    break
+                if any(titles[pos] == titles[other] or pairwise[pos, other] >= DUPLICATE_SIMILARITY for other in keep):
+                    continue
+                keep.append(pos)
+        elif diversify == 'mmr':
+            keep = []
+            max_redundancy = query_similarity
+            available = np.ones(len(indices), dtype=bool)
+            for _ in range(min(num_recommendations, len(indices))):
+                mmr_scores = mmr_lambda * scores - (1 - mmr_lambda) * max_redundancy
+                mmr_scores[~available] = -np.inf
+                pos = int(np.argmax(mmr_scores))
+                keep.append(pos)
+                available[pos] = False
+                np.maximum(max_redundancy, pairwise[pos], out=max_redundancy)
+        else:
+            raise ValueError(f"Unknown diversify method '{diversify}'; use 'mmr' or 'collapse'")
+        
+        keep = np.array(keep, dtype=np.int64)
+        return indices[keep], scores[keep]
+    
+    def _make_result(self, indices, scores, as_frame, meta=None):
+        """
+        Package recommended row ids and scores for the caller.
+        
+        Args:
+            indices (array-like): Recommended row ids, best first
+            scores (array-like): Similarity score for each row id
+            as_frame (bool): Return a DataFrame instead of a RecommendationResult
+            meta (dict): Query details to attach to the result
+            
+        Returns:
+            pd.DataFrame or RecommendationResult: The recommendations
+        """
+        result = RecommendationResult(indices, scores, self.catalog, meta)
+        return result.to_frame() if as_frame else result
+    
+    def resolve_title(self, title):
+        """
+        Find the catalog row a title refers to.
+        
+        An exact match wins, so a title picked from search_titles always
+        resolves to its own row. Free-typed titles fall back to a literal,
+        case-insensitive substring match, preferring a title equal to the
+        query up to case.
+        
+        Args:
+            title (str): Title picked or typed by the user
+            
+        Returns:
+            int: Catalog row id, or None if no title matches
+        """
+        if self.title_rows is None:
+            self.build_title_index()
+        item_id = self.title_rows.get(title)
+        if item_id is not None:
+            return item_id
+        
+        # Among titles containing the query, prefer one equal to it up to
+        # case, then the lowest row id
+        query = str(title).lower()
+        matches = []
+        for candidate, row in self.title_rows.items():
+            lowered = str(candidate).lower()
+            if query in lowered:
+                matches.append((lowered != query, row))
+        return min(matches)[1] if matches else None
+    
+    def get_recommendations(self, title, num_recommendations=10, as_frame=True, filters=None,
+                            diversify=None, mmr_lambda=0.7):
         """
         Get top N recommendations for a given movie title.
         
         Args:
-            title (str): Movie/Show title to get recommendations for
+            title (str): Movie/Show title to get recommendations for, resolved
+                with resolve_title
             num_recommendations (int): Number of recommendations to return
+            as_frame (bool): If False, return a lightweight RecommendationResult
+            filters (dict): Optional filters, see filter_mask
+            diversify (str): Optional re-ranking of a larger candidate pool,
+                'mmr' or 'collapse' (see _rerank)
+            mmr_lambda (float): Relevance/diversity trade-off for 'mmr'
             
         Returns:
             pd.DataFrame: DataFrame with recommended movies
         """
-        if self.similarity_matrix is None:
+        if self.similarity_matrix is None and self.neighbor_ids is None:
             print("Error: Similarity matrix not computed. Run compute_similarity() first.")
             return None
         
-        movie_list = self.df[self.df['title'].str.contains(title, case=False, na=False)]
-        
-        if len(movie_list) == 0:
+        movie_index = self.resolve_title(title)
+        if movie_index is None:
             print(f"No movies found matching '{title}'")
             return None
         
-        movie_index = movie_list.index[0]
+        return self.get_recommendations_by_id(movie_index, num_recommendations, as_frame, filters,
+                                              diversify, mmr_lambda)
+    
+    def get_recommendations_by_id(self, movie_index, num_recommendations=10, as_frame=True, filters=None,
+                                  diversify=None, mmr_lambda=0.7):
+        """
+        Get top N recommendations for a catalog row.
+        
+        Args:
+            movie_index (int): Catalog row id to get recommendations for
+            num_recommendations (int): Number of recommendations to return
+            as_frame (bool): If False, return a lightweight RecommendationResult
+            filters (dict): Optional filters, see filter_mask
+            diversify (str): Optional re-ranking, see get_recommendations
+            mmr_lambda (float): Relevance/diversity trade-off for 'mmr'
+            
+        Returns:
+            pd.DataFrame: DataFrame with recommended movies, or None if the
+            row id is out of range
+        """
+        if self.similarity_matrix is None and self.neighbor_ids is None:
+            print("Error: Similarity matrix not computed. Run compute_similarity() first.")
+            return None
+        if not 0 <= movie_index < len(self.soup_index):
+            print(f"Error: Row id {movie_index} out of range")
+            return None
         
-        similarity_scores = self.similarity_matrix[movie_index]
-        similar_indices = similarity_scores.argsort()[::-1][1:num_recommendations + 1]
+        movie_index = int(movie_index)
+        mask = self.filter_mask(filters)
+        pool_size = num_recommendations * DIVERSITY_POOL_FACTOR if diversify else num_recommendations
         
-        # Use the standardized column names created in preprocessing
-        output_cols = ['title', 'type', 'listed_in', 'description', 'release_year', 'poster_url']
-        available_cols = [col for col in output_cols if col in self.df.columns]
+        similar_indices = None
+        if self.neighbor_ids is not None and pool_size <= self.neighbor_k:
+            similar_indices, scores = self._table_neighbors(movie_index)
+            if mask is not None:
+                allowed = mask[similar_indices]
+                similar_indices, scores = similar_indices[allowed], scores[allowed]
+            if len(similar_indices) >= pool_size:
+                similar_indices, scores = similar_indices[:pool_size], scores[:pool_size]
+            else:
+                similar_indices = None
         
-        recommendations = self.df.iloc[similar_indices][available_cols].copy()
-        recommendations['similarity_score'] = similarity_scores[similar_indices]
-        recommendations['similarity_score'] = recommendations['similarity_score'].fillna(0)
-        recommendations = recommendations.reset_index(drop=True)
+        if similar_indices is None:
+            similarity_scores = self.item_similarity(movie_index)
+            similar_indices = self._top_neighbors(similarity_scores, pool_size, exclude=movie_index, mask=mask)
+            scores = similarity_scores[similar_indices]
         
-        return recommendations
+        candidate_count = len(similar_indices)
+        if diversify:
+            similar_indices, scores = self._rerank(similar_indices, scores, num_recommendations, diversify, mmr_lambda,
+                                                   query_ids=[movie_index])
+        return self._make_result(similar_indices, scores, as_frame,
+                                 meta={'query_id': int(movie_index), 'pool_size': candidate_count})
     
-    def get_recommendations_by_tag(self, tag, num_recommendations=10):
+    def _recommend_for_seeds(self, seed_indices, num_recommendations, mask=None, block_size=256):
+        """
+        Rank rows by their best similarity to any of the seed rows.
+        
+        Equivalent to taking the top N neighbors of every seed and keeping
+        each row's highest score, but done as one max-pooled score vector.
+        Each seed's own similarity to itself is ignored.
+        
+        When N fits in the neighbor table, the seeds' table rows are pooled
+        and only seeds whose list keeps fewer than N allowed rows are scored
+        against the catalog. This is exact: a row missing from a seed's top-N
+        list is outranked by that list's N rows in the pooled ranking too.
+        
+        Args:
+            seed_indices (np.ndarray): Row indices of the seeds
+            num_recommendations (int): Number of recommendations to return
+            mask (np.ndarray): Optional boolean mask of allowed rows
+            block_size (int): Seeds scored per step, bounding temporary memory
+            
+        Returns:
+            tuple: (row indices, scores), best first
+        """
+        seed_indices = np.asarray(seed_indices)
+        pooled = np.full(len(self.soup_index), -np.inf)
+        uncovered, dtype = seed_indices, np.float64
+        if self.neighbor_ids is not None and num_recommendations <= self.neighbor_k:
+            soups = self.soup_index[seed_indices]
+            ids = np.asarray(self.neighbor_ids[soups])
+            # Each seed's list without itself, cut to neighbor_k as in _table_neighbors
+            listed = ids != seed_indices[:, None]
+            listed &= np.cumsum(listed, axis=1) <= self.neighbor_k
+            if mask is not None:
+                listed &= mask[ids]
+            np.maximum.at(pooled, ids[listed], np.asarray(self.neighbor_scores[soups])[listed])
+            uncovered = seed_indices[listed.sum(axis=1) < num_recommendations]
+            # Scores pooled with table entries are rounded to the table's
+            # precision, so equal scores still tie and break by row id
+            dtype = self.neighbor_scores.dtype
+        
+        for start in range(0, len(uncovered), block_size):
+            block = uncovered[start:start + block_size]
+            block_scores = np.nan_to_num(self.item_similarity(block), nan=0.0).astype(dtype, copy=False).astype(np.float64)
+            block_scores[np.arange(len(block)), block] = -np.inf
+            np.maximum(pooled, block_scores.max(axis=0), out=pooled)
+        
+        similar_indices = self._top_neighbors(pooled, num_recommendations, exclude=[], mask=mask)
+        return similar_indices, pooled[similar_indices]
+    
+    def get_recommendations_by_tag(self, tag, num_recommendations=10, as_frame=True, filters=None,
+                                   diversify=None, mmr_lambda=0.7):
         """
         Get top N recommendations for a given tag/genre.
         
         Args:
             tag (str): Genre/tag to get recommendations for
             num_recommendations (int): Number of recommendations to return
+            as_frame (bool): If False, return a lightweight RecommendationResult
+            filters (dict): Optional filters, see filter_mask
+            diversify (str): Optional re-ranking, 'mmr' or 'collapse'
+            mmr_lambda (float): Relevance/diversity trade-off for 'mmr'
             
         Returns:
-            pd.DataFrame: DataFrame with recommended movies matching the tag
+            pd.DataFrame: DataFrame with recommended movies matching the tag.
+            The result's meta (attrs for a DataFrame) holds matched_count,
+            seed_count and pool_size
         """
-        if self.similarity_matrix is None:
+        if self.similarity_matrix is None and self.neighbor_ids is None:
             print("Error: Similarity matrix not computed. Run compute_similarity() first.")
             return None
         
-        movies_with_tag = self.df[self.df['listed_in'].str.contains(tag, case=False, na=False)]
+        movies_with_tag_indices = np.flatnonzero(self.catalog.contains('listed_in', tag))
         
-        if len(movies_with_tag) == 0:
+        if len(movies_with_tag_indices) == 0:
             print(f"No movies found with tag '{tag}'")
             return None
         
-        movies_with_tag_indices = movies_with_tag.index.tolist()
-        
-        similarity_scores_dict = {}
-        for idx in movies_with_tag_indices:
-            similarity_scores = self.similarity_matrix[idx]
-            similar_indices = similarity_scores.argsort()[::-1][1:num_recommendations + 1]
-            for sim_idx in similar_indices:
-                if sim_idx not in similarity_scores_dict:
-                    similarity_scores_dict[sim_idx] = similarity_scores[sim_idx]
-                else:
-                    similarity_scores_dict[sim_idx] = max(similarity_scores_dict[sim_idx], similarity_scores[sim_idx])
-        
-        sorted_indices = sorted(similarity_scores_dict.items(), key=lambda x: x[1], reverse=True)[:num_recommendations]
-        similar_indices = [idx for idx, _ in sorted_indices]
-        
-        output_cols = ['title', 'type', 'listed_in', 'description', 'release_year', 'poster_url']
-        available_cols = [col for col in output_cols if col in self.df.columns]
-        
-        recommendations = self.df.iloc[similar_indices][available_cols].copy()
-        recommendations['similarity_score'] = [score for _, score in sorted_indices]
-        recommendations['similarity_score'] = recommendations['similarity_score'].fillna(0)
-        recommendations = recommendations.reset_index(drop=True)
-        
-        return recommendations
+        pool_size = num_recommendations * DIVERSITY_POOL_FACTOR if diversify else num_recommendations
+        similar_indices, scores = self._recommend_for_seeds(movies_with_tag_indices, pool_size, self.filter_mask(filters))
+        candidate_count = len(similar_indices)
+        if diversify:
+            similar_indices, scores = self._rerank(similar_indices, scores, num_recommendations, diversify, mmr_lambda)
+        meta = {
+            'matched_count': len(movies_with_tag_indices),
+            'seed_count': len(movies_with_tag_indices),
+            'pool_size': candidate_count,
+        }
+        return self._make_result(similar_indices, scores, as_frame, meta)
     
-    def get_recommendations_by_multiple_tags(self, tags_list, num_recommendations=10):
+    def get_recommendations_by_multiple_tags(self, tags_list, num_recommendations=10, as_frame=True, filters=None,
+                                             diversify=None, mmr_lambda=0.7):
         """
         Get top N recommendations for multiple tags/genres.
         
         Args:
             tags_list (list): List of genres/tags to get recommendations for
             num_recommendations (int): Number of recommendations to return
+            as_frame (bool): If False, return a lightweight RecommendationResult
+            filters (dict): Optional filters, see filter_mask
+            diversify (str): Optional re-ranking, 'mmr' or 'collapse'
+            mmr_lambda (float): Relevance/diversity trade-off for 'mmr'
             
         Returns:
-            pd.DataFrame: DataFrame with recommended movies matching any of the tags
+            pd.DataFrame: DataFrame with recommended movies matching any of the tags.
+            The result's meta (attrs for a DataFrame) holds matched_count,
+            seed_count, per-tag tag_counts and pool_size
         """
-        if self.similarity_matrix is None:
+        if self.similarity_matrix is None and self.neighbor_ids is None:
             print("Error: Similarity matrix not computed. Run compute_similarity() first.")
             return None
         
@@ -279,39 +1267,205 @@ class NetflixRecommender:
             print("Error: No tags provided")
             return None
         
-        all_movies_with_tags = pd.DataFrame()
+        tag_mask = np.zeros(len(self.catalog), dtype=bool)
+        tag_counts = {}
         for tag in tags_list:
-            movies_with_tag = self.df[self.df['listed_in'].str.contains(tag, case=False, na=False)]
-            all_movies_with_tags = pd.concat([all_movies_with_tags, movies_with_tag]).drop_duplicates()
+            matches = self.catalog.contains('listed_in', tag)
+            tag_counts[tag] = int(matches.sum())
+            tag_mask |= matches
+        movies_with_tags_indices = np.flatnonzero(tag_mask)
         
-        if len(all_movies_with_tags) == 0:
+        if len(movies_with_tags_indices) == 0:
             print(f"No movies found with tags {tags_list}")
             return None
         
-        movies_with_tags_indices = all_movies_with_tags.index.tolist()
+        pool_size = num_recommendations * DIVERSITY_POOL_FACTOR if diversify else num_recommendations
+        similar_indices, scores = self._recommend_for_seeds(movies_with_tags_indices, pool_size, self.filter_mask(filters))
+        candidate_count = len(similar_indices)
+        if diversify:
+            similar_indices, scores = self._rerank(similar_indices, scores, num_recommendations, diversify, mmr_lambda)
+        meta = {
+            'matched_count': len(movies_with_tags_indices),
+            'seed_count': len(movies_with_tags_indices),
+            'tag_counts': tag_counts,
+            'pool_size': candidate_count,
+        }
+        return self._make_result(similar_indices, scores, as_frame, meta)
+    
+    def text_vector(self, text):
+        """
+        Vectorize free text into the same feature space as tfidf_matrix.
         
-        similarity_scores_dict = {}
-        for idx in movies_with_tags_indices:
-            similarity_scores = self.similarity_matrix[idx]
-            similar_indices = similarity_scores.argsort()[::-1][1:num_recommendations + 1]
-            for sim_idx in similar_indices:
-                if sim_idx not in similarity_scores_dict:
-                    similarity_scores_dict[sim_idx] = similarity_scores[sim_idx]
-                else:
-                    similarity_scores_dict[sim_idx] = max(similarity_scores_dict[sim_idx], similarity_scores[sim_idx])
+        The text goes through clean_text and the fitted vectorizer. With
+        per-field features only the description block is filled, since the
+        genre, cast and director blocks hold exact entries.
+        
+        Args:
+            text (str): Free-text query
+            
+        Returns:
+            scipy.sparse.csr_matrix: One L2-normalized feature row
+        """
+        cleaned = self.clean_text(text)
+        if not self.field_weights:
+            return self.tfidf_vectorizer.transform([cleaned])
+        
+        blocks = []
+        for field, weight in self.field_weights.items():
+            if weight <= 0 or field not in self.field_matrices:
+                continue
+            if field == 'description':
+                blocks.append(self.field_vectorizers[field].transform([cleaned]) * np.sqrt(weight))
+            else:
+                blocks.append(sparse.csr_matrix((1, self.field_matrices[field].shape[1])))
+        return normalize(sparse.hstack(blocks, format='csr'))
+    
+    def get_recommendations_by_text(self, query, num_recommendations=10, as_frame=True, filters=None,
+                                    diversify=None, mmr_lambda=0.7):
+        """
+        Get top N recommendations for a free-text description.
+        
+        The query is vectorized with the fitted vectorizer and scored against
+        the catalog with one sparse matrix-vector product, so the similarity
+        matrix is never touched.
+        
+        Args:
+            query (str): Free text, e.g. "dark sci-fi mystery with time travel"
+            num_recommendations (int): Number of recommendations to return
+            as_frame (bool): If False, return a lightweight RecommendationResult
+            filters (dict): Optional filters, see filter_mask
+            diversify (str): Optional re-ranking, 'mmr' or 'collapse'
+            mmr_lambda (float): Relevance/diversity trade-off for 'mmr'
+            
+        Returns:
+            pd.DataFrame: DataFrame with the best matching movies
+        """
+        if self.tfidf_matrix is None:
+            print("Error: Features not vectorized. Run build_model() first.")
+            return None
+        
+        query_vector = self.text_vector(query)
+        if query_vector.nnz == 0:
+            print(f"No known terms in '{query}'")
+            return None
+        
+        pool_size = num_recommendations * DIVERSITY_POOL_FACTOR if diversify else num_recommendations
+        similarity_scores = self.vector_similarity(query_vector)
+        similar_indices = self._top_neighbors(similarity_scores, pool_size, exclude=[], mask=self.filter_mask(filters))
+        scores = similarity_scores[similar_indices]
+        candidate_count = len(similar_indices)
+        if diversify:
+            similar_indices, scores = self._rerank(similar_indices, scores, num_recommendations, diversify, mmr_lambda)
+        return self._make_result(similar_indices, scores, as_frame, meta={'pool_size': candidate_count})
+    
+    def get_recommendations_for_profile(self, item_ids, weights=None, num_recommendations=10, as_frame=True,
+                                        filters=None, pooling='centroid', diversify=None, mmr_lambda=0.7):
+        """
+        Get top N recommendations for a watch history.
+        
+        With 'centroid' pooling the seeds' feature rows are averaged with
+        the given weights into one profile vector, scored with a single
+        sparse matrix-vector product, so latency barely grows with history
+        length. 'max' pooling instead ranks rows by their best weighted
+        similarity to any seed, using one sparse product with all seeds.
+        The seed rows themselves are never recommended.
+        
+        Args:
+            item_ids (array-like): Catalog row ids of the watched titles
+            weights (array-like): Optional weight per seed, e.g. favoring
+                recent views; defaults to equal weights
+            num_recommendations (int): Number of recommendations to return
+            as_frame (bool): If False, return a lightweight RecommendationResult
+            filters (dict): Optional filters, see filter_mask
+            pooling (str): 'centroid' or 'max'
+            diversify (str): Optional re-ranking, 'mmr' or 'collapse'
+            mmr_lambda (float): Relevance/diversity trade-off for 'mmr'
+            
+        Returns:
+            pd.DataFrame: DataFrame with recommended movies
+        """
+        if self.tfidf_matrix is None:
+            print("Error: Features not vectorized. Run build_model() first.")
+            return None
         
-        sorted_indices = sorted(similarity_scores_dict.items(), key=lambda x: x[1], reverse=True)[:num_recommendations]
-        similar_indices = [idx for idx, _ in sorted_indices]
+        item_ids = np.asarray(item_ids, dtype=np.int64).ravel()
+        if len(item_ids) == 0 or item_ids.min() < 0 or item_ids.max() >= len(self.soup_index):
+            print("Error: Profile needs at least one valid catalog row id.")
+            return None
+        weights = np.ones(len(item_ids)) if weights is None else np.asarray(weights, dtype=np.float64).ravel()
+        if len(weights) != len(item_ids):
+            print("Error: Profile weights must match the number of item ids.")
+            return None
         
-        output_cols = ['title', 'type', 'listed_in', 'description', 'release_year', 'poster_url']
-        available_cols = [col for col in output_cols if col in self.df.columns]
+        seed_vectors = self.item_vectors(item_ids)
+        if pooling == 'centroid':
+            profile = normalize(sparse.csr_matrix(weights) @ seed_vectors)
+            similarity_scores = self.vector_similarity(profile)
+        elif pooling == 'max':
+            soup_scores = (self.tfidf_matrix @ seed_vectors.T).toarray() * weights
+            similarity_scores = soup_scores.max(axis=1)[self.soup_index]
+        else:
+            raise ValueError(f"Unknown pooling '{pooling}'; use 'centroid' or 'max'")
         
-        recommendations = self.df.iloc[similar_indices][available_cols].copy()
-        recommendations['similarity_score'] = [score for _, score in sorted_indices]
-        recommendations['similarity_score'] = recommendations['similarity_score'].fillna(0)
-        recommendations = recommendations.reset_index(drop=True)
+        pool_size = num_recommendations * DIVERSITY_POOL_FACTOR if diversify else num_recommendations
+        similar_indices = self._top_neighbors(similarity_scores, pool_size, exclude=item_ids,
+                                              mask=self.filter_mask(filters))
+        scores = similarity_scores[similar_indices]
+        candidate_count = len(similar_indices)
+        if diversify:
+            similar_indices, scores = self._rerank(similar_indices, scores, num_recommendations, diversify, mmr_lambda,
+                                                   query_ids=item_ids)
+        return self._make_result(similar_indices, scores, as_frame,
+                                 meta={'seed_count': len(item_ids), 'pool_size': candidate_count})
+    
+    def get_item(self, item_id):
+        """
+        Get the raw dataset row of a catalog row id.
         
-        return recommendations
+        Row ids are positions, so this is a direct positional lookup; use
+        the ids carried by RecommendationResult rather than matching titles,
+        which may repeat.
+        
+        Args:
+            item_id (int): Catalog row id
+            
+        Returns:
+            dict: Column name to value for the row, or None for an unknown id
+        """
+        item_id = int(item_id)
+        if self.df is None or not 0 <= item_id < len(self.df):
+            return None
+        return self.df.iloc[item_id].to_dict()
+    
+    def build_title_index(self):
+        """
+        Index the distinct catalog titles for typeahead search.
+        
+        Also maps every title to the first row holding it in title_rows, so
+        resolve_title does not scan the title column.
+        """
+        print(f"\n--- Building Title Index ---")
+        self.title_rows = {}
+        for row, title in enumerate(self.catalog.column('title')):
+            if title is not None:
+                self.title_rows.setdefault(title, row)
+        self.title_index = TitleSearchIndex(self.title_rows)
+        print(f"Indexed {len(self.title_index)} titles")
+    
+    def search_titles(self, query, limit=10):
+        """
+        Typeahead search over catalog titles.
+        
+        Args:
+            query (str): Partial title typed so far
+            limit (int): Maximum number of titles to return
+            
+        Returns:
+            list: Matching titles ranked by prefix and trigram overlap
+        """
+        if self.title_index is None:
+            self.build_title_index()
+        return self.title_index.search(query, limit)
     
     def get_all_tags(self):
         """
@@ -321,12 +1475,23 @@ class NetflixRecommender:
             list: Sorted list of unique tags
         """
         all_tags = set()
-        for tags_str in self.df['listed_in'].dropna():
+        for tags_str in self.catalog.unique('listed_in'):
             tags = [tag.strip() for tag in str(tags_str).split(',')]
             all_tags.update(tags)
         
         return sorted(list(all_tags))
     
+    def get_tag_counts(self):
+        """
+        Count how many titles carry each tag/genre.
+        
+        Returns:
+            dict: Tag to number of rows, most common first
+        """
+        tags = pd.Series(self.catalog.column('listed_in')).dropna().astype(str).str.split(',').explode().str.strip()
+        counts = tags[tags != ''].value_counts()
+        return {tag: int(count) for tag, count in counts.items()}
+    
     def evaluate_recommendations(self, test_title, num_recommendations=5):
         """
         Evaluate and display recommendations for a given title.
@@ -345,14 +1510,245 @@ class NetflixRecommender:
         else:
             print(f"Could not get recommendations for '{test_title}'")
     
-    def build_model(self):
-        """Build the complete recommendation model."""
+    def build_model(self, neighbor_k=None, field_weights=None, token_cache=None,
+                    max_memory_bytes=None, n_jobs=1, diagnostics=False, profile_memory=False,
+                    vectorizer=None):
+        """
+        Build the complete recommendation model.
+        
+        Stage timings are recorded in build_stats['timings'].
+        
+        Args:
+            neighbor_k (int): If given, also precompute the top-k neighbors of
+                every title so small title queries skip the similarity scan
+            field_weights (dict): If given, vectorize genre, cast, director and
+                description separately and combine them with these weights
+                instead of vectorizing a single metadata soup
+            token_cache (TokenCache): Persistent cache of cleaned text; its
+                hit statistics for this build go to build_stats['token_cache']
+            max_memory_bytes (int): If given, compute similarity in blocks within
+                this budget and keep only a neighbor table (neighbor_k, default
+                20, wide) instead of the dense similarity matrix; ValueError
+                if it is below what that needs, see compute_similarity
+            n_jobs (int): Threads for the blocked similarity computation
+            diagnostics (bool): Print schema mapping and missing value counts
+            profile_memory (bool): Record the peak traced memory of each stage
+                in build_stats['peak_memory']
+            vectorizer (TfidfVectorizer): Fitted vectorizer to reuse instead of
+                fitting one on this dataset, so several models share one
+                vocabulary; ignored with field_weights
+        """
         if self.df is None:
             print("Error: No data loaded. Please load data first.")
             return
         
-        self.preprocess_data()
-        self.create_metadata_soup()
-        self.vectorize_features()
-        self.compute_similarity()
+        self.build_stats = {}
+        if token_cache is not None:
+            token_cache.reset_stats()
+        with _track_stage(self.build_stats, 'preprocess', profile_memory):
+            self.preprocess_data(diagnostics=diagnostics)
+        if field_weights:
+            with _track_stage(self.build_stats, 'vectorize', profile_memory):
+                self.vectorize_fields(token_cache=token_cache)
+                self.combine_field_matrices(field_weights)
+        else:
+            with _track_stage(self.build_stats, 'metadata_soup', profile_memory):
+                self.create_metadata_soup(token_cache=token_cache)
+            with _track_stage(self.build_stats, 'vectorize', profile_memory):
+                if vectorizer is not None:
+                    self.apply_vectorizer(vectorizer)
+                else:
+                    self.vectorize_features()
+                self.release_metadata_soup()
+        with _track_stage(self.build_stats, 'similarity', profile_memory):
+            self.compute_similarity(max_memory_bytes, top_k=neighbor_k or 20, n_jobs=n_jobs)
+        with _track_stage(self.build_stats, 'filter_masks', profile_memory):
+            self.build_filter_masks()
+        with _track_stage(self.build_stats, 'title_index', profile_memory):
+            self.build_title_index()
+        if neighbor_k and self.similarity_matrix is not None:
+            with _track_stage(self.build_stats, 'neighbor_table', profile_memory):
+                self.build_neighbor_table(neighbor_k)
+        
+        if token_cache is not None:
+            self.build_stats['token_cache'] = token_cache.stats()
+            print(f"\nToken cache: {token_cache.hits} hits, {token_cache.misses} misses "
+                  f"({self.build_stats['token_cache']['hit_rate']:.0%} hit rate)")
+        if profile_memory:
+            print("\nPeak memory per stage:")
+            for stage, peak in self.build_stats['peak_memory'].items():
+                print(f"  {stage}: {peak / 1024:.1f} KB")
         print("\n✓ Model built successfully!")
+    
+    def build_incremental(self, previous, neighbor_k=None, token_cache=None, **build_options):
+        """
+        Build the model by updating a previous build of an older dataset version.
+        
+        The previous vectorizer is reused without refitting. Soups that also
+        existed in the previous build keep their vectors and, with a dense
+        similarity matrix, their pairwise scores; only new soups are cleaned,
+        vectorized and scored. Filter masks and the neighbor table are then
+        rebuilt. Because the vocabulary and idf weights are not refitted, this
+        is meant for small changes; larger ones should use build_model.
+        
+        Falls back to build_model when the previous build used per-field
+        features or has no vectorizer.
+        
+        Args:
+            previous (NetflixRecommender): Built recommender over the previous
+                version of the dataset
+            neighbor_k (int): If given, also rebuild the neighbor table
+            token_cache (TokenCache): Persistent cache of cleaned text
+            **build_options: Other build_model options, used on fallback
+        """
+        if self.df is None:
+            print("Error: No data loaded. Please load data first.")
+            return
+        if previous.field_weights or previous.tfidf_vectorizer is None or previous.tfidf_matrix is None:
+            self.build_model(neighbor_k=neighbor_k, token_cache=token_cache, **build_options)
+            return
+        
+        self.build_stats = {}
+        if token_cache is not None:
+            token_cache.reset_stats()
+        with _track_stage(self.build_stats, 'preprocess'):
+            self.preprocess_data()
+        
+        with _track_stage(self.build_stats, 'vectorize'):
+            print("\n--- Incremental Vectorization ---")
+            codes, uniques = pd.factorize(self._raw_soups())
+            self.soup_index = codes.astype(np.int32)
+            previous_ids = pd.Index(pd.unique(previous._raw_soups())).get_indexer(uniques)
+            reused = np.flatnonzero(previous_ids >= 0)
+            added = np.flatnonzero(previous_ids < 0)
+            print(f"Reusing {len(reused)} of {len(uniques)} distinct soups, vectorizing {len(added)}")
+            self.build_stats['unique_soups'] = len(uniques)
+            self.build_stats['reused_soups'] = len(reused)
+            
+            self.tfidf_vectorizer = previous.tfidf_vectorizer
+            added_vectors = self.tfidf_vectorizer.transform(self._clean_texts(uniques[added], token_cache))
+            stacked = sparse.vstack([previous.tfidf_matrix[previous_ids[reused]], added_vectors], format='csr')
+            order = np.empty(len(uniques), dtype=np.int64)
+            order[np.concatenate([reused, added])] = np.arange(len(uniques))
+            self.tfidf_matrix = stacked[order]
+            self.metadata_soups = None
+        
+        with _track_stage(self.build_stats, 'similarity'):
+            if previous.similarity_matrix is None:
+                self.compute_similarity(**previous.similarity_options)
+            else:
+                print(f"\n--- Updating Similarity Matrix ---")
+                self.similarity_options = dict(previous.similarity_options)
+                similarity = np.empty((len(uniques), len(uniques)), dtype=previous.similarity_matrix.dtype)
+                similarity[np.ix_(reused, reused)] = previous.similarity_matrix[np.ix_(previous_ids[reused], previous_ids[reused])]
+                added_rows = (self.tfidf_matrix[added] @ self.tfidf_matrix.T).toarray()
+                similarity[added] = added_rows
+                similarity[:, added] = added_rows.T
+                self.similarity_matrix = similarity
+                print(f"Similarity matrix shape: {self.similarity_matrix.shape}")
+        with _track_stage(self.build_stats, 'filter_masks'):
+            self.build_filter_masks()
+        with _track_stage(self.build_stats, 'title_index'):
+            self.build_title_index()
+        if neighbor_k and self.similarity_matrix is not None:
+            with _track_stage(self.build_stats, 'neighbor_table'):
+                self.build_neighbor_table(neighbor_k)
+        
+        if token_cache is not None:
+            self.build_stats['token_cache'] = token_cache.stats()
+        print("\n✓ Model updated incrementally!")
+    
+    def memory_usage(self):
+        """
+        Approximate memory held by the built model.
+        
+        The fitted vectorizer is not counted, since it may be shared with
+        other models.
+        
+        Returns:
+            dict: Bytes of the raw rows, catalog, feature matrix, similarity
+            matrix, neighbor table and filter masks, plus a 'total' entry
+        """
+        def array_bytes(*arrays):
+            return sum(array.nbytes for array in arrays if array is not None)
+        
+        usage = {
+            'dataframe': int(self.df.memory_usage(deep=True).sum()) if self.df is not None else 0,
+            'catalog': self.catalog.memory_usage()['total'] if self.catalog is not None else 0,
+            'tfidf_matrix': 0,
+            'similarity_matrix': array_bytes(self.similarity_matrix),
+            'neighbor_table': array_bytes(self.soup_index, self.neighbor_ids, self.neighbor_scores),
+            'filter_masks': sum(mask.nbytes for masks in self.filter_masks.values() for mask in masks.values()),
+        }
+        if self.tfidf_matrix is not None:
+            matrix = self.tfidf_matrix
+            usage['tfidf_matrix'] = array_bytes(matrix.data, matrix.indices, matrix.indptr)
+        usage['total'] = sum(usage.values())
+        return usage
+    
+    def save(self, path):
+        """
+        Save the built model to a directory.
+        
+        Large arrays (ARTIFACT_ARRAYS and the TF-IDF matrix's buffers) are
+        written as .npy files so load can memory-map them; everything else
+        is pickled into model.pkl, together with the names of the arrays
+        written. Array files left by an earlier save are removed first, so
+        the directory never mixes two models.
+        
+        Args:
+            path (str): Artifact directory, created if missing
+        """
+        os.makedirs(path, exist_ok=True)
+        # Unlink rather than overwrite: a loaded model may memory-map these
+        # files, and unlinked files stay readable through existing maps
+        for name in ['model.pkl'] + [f"{name}.npy" for name in ARTIFACT_ARRAYS + TFIDF_ARRAYS]:
+            if os.path.exists(os.path.join(path, name)):
+                os.remove(os.path.join(path, name))
+        
+        state = dict(self.__dict__)
+        saved = []
+        for name in ARTIFACT_ARRAYS:
+            array = state.pop(name)
+            if array is not None:
+                np.save(os.path.join(path, f"{name}.npy"), array)
+                saved.append(name)
+        tfidf_matrix = state.pop('tfidf_matrix')
+        if tfidf_matrix is not None:
+            for name in TFIDF_ARRAYS:
+                np.save(os.path.join(path, f"{name}.npy"), getattr(tfidf_matrix, name[len('tfidf_'):]))
+                saved.append(name)
+            state['tfidf_shape'] = tfidf_matrix.shape
+        state['artifact_arrays'] = saved
+        with open(os.path.join(path, 'model.pkl'), 'wb') as handle:
+            pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"Model saved to {path}")
+    
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Load a model saved with save.
+        
+        Args:
+            path (str): Artifact directory
+            mmap_mode (str): Passed to np.load; 'r' maps the arrays read-only
+                so pages are read on demand, None reads them into memory
+            
+        Returns:
+            NetflixRecommender: The built recommender
+        """
+        with open(os.path.join(path, 'model.pkl'), 'rb') as handle:
+            state = pickle.load(handle)
+        recommender = cls(None)
+        tfidf_shape = state.pop('tfidf_shape', None)
+        # Only the arrays this save wrote; missing ones stay None
+        saved = set(state.pop('artifact_arrays', ()))
+        recommender.__dict__.update(state)
+        for name in ARTIFACT_ARRAYS:
+            array_path = os.path.join(path, f"{name}.npy")
+            setattr(recommender, name, np.load(array_path, mmap_mode=mmap_mode) if name in saved else None)
+        if tfidf_shape is not None:
+            parts = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in TFIDF_ARRAYS]
+            recommender.tfidf_matrix = sparse.csr_matrix(tuple(parts), shape=tfidf_shape)
+        print(f"Model loaded from {path}")
+        return recommender
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+
+class RecommendationResult:
+    """
+    Compact recommendation result: parallel arrays of row ids and scores.
+
+    Display columns are not copied up front; they are gathered from the
+    catalog the first time they are accessed and then kept on the result.
+    The row ids are stable catalog positions, usable with
+    NetflixRecommender.get_item.
+    """
+
+    __slots__ = ('ids', 'scores', 'meta', '_catalog', '_cache')
+
+    def __init__(self, ids, scores, catalog, meta=None):
+        """
+        Initialize the result.
+
+        Args:
+            ids (np.ndarray): Catalog row ids, best match first
+            scores (np.ndarray): Similarity score for each row id
+            catalog (CatalogStore): Catalog the row ids refer to
+            meta (dict): Query details, e.g. 'query_id' for the row a title
+                query resolved to
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.scores = np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=0.0)
+        self.meta = dict(meta or {})
+        self._catalog = catalog
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def columns(self):
+        """list: Display columns available on this result, plus similarity_score."""
+        return self._catalog.columns + ['similarity_score']
+
+    def column(self, name):
+        """
+        Get the values of one column for the recommended rows.
+
+        Args:
+            name (str): Catalog column name or 'similarity_score'
+
+        Returns:
+            np.ndarray: Column values in result order
+        """
+        if name == 'similarity_score':
+            return self.scores
+        if name not in self._cache:
+            self._cache[name] = self._catalog.take(name, self.ids)
+        return self._cache[name]
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def rows(self, columns=None):
+        """
+        Iterate over the recommended rows as dictionaries.
+
+        Args:
+            columns (list): Columns to include; defaults to all columns
+
+        Yields:
+            dict: Column name to value for one recommendation
+        """
+        columns = [col for col in (columns or self.columns) if col in self.columns]
+        values = [self.column(col) for col in columns]
+        for row_values in zip(*values):
+            yield dict(zip(columns, row_values))
+
+    def to_state(self):
+        """
+        Strip the result down to what is needed to rebuild it.
+
+        Returns:
+            dict: ids, scores and meta; no catalog columns
+        """
+        return {
+            'ids': self.ids,
+            'scores': self.scores,
+            'meta': dict(self.meta),
+        }
+
+    @classmethod
+    def from_state(cls, state, catalog):
+        """
+        Rebuild a result from to_state() output against a catalog.
+
+        Args:
+            state (dict): Output of to_state()
+            catalog (CatalogStore): Catalog the row ids refer to
+
+        Returns:
+            RecommendationResult: Result with display columns gathered lazily
+        """
+        return cls(state['ids'], state['scores'], catalog, state['meta'])
+
+    def to_frame(self):
+        """
+        Convert the result to a DataFrame.
+
+        Returns:
+            pd.DataFrame: One row per recommendation with a similarity_score
+            column, with meta in attrs
+        """
+        frame = pd.DataFrame({col: self.column(col) for col in self.columns})
+        frame.attrs.update(self.meta)
+        return frame
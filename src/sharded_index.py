@@ -0,0 +1,258 @@
+import heapq
+import multiprocessing
+from itertools import islice
+import numpy as np
+from recommendation_engine import NetflixRecommender
+
+
+def _serve_shard(conn, rows, offset):
+    """
+    Worker process loop holding one shard of the catalog.
+
+    The shard first reports the term counts of its rows, then waits for the
+    vectorizer the coordinator fits from every shard's counts. Vectorized
+    with that shared vectorizer, its rows get the same vectors they have in
+    a single-process model. Requests arrive on the pipe as (command, *args)
+    tuples and every reply is ('ok', value) or ('error', message).
+
+    Args:
+        conn (multiprocessing.connection.Connection): Pipe to the coordinator
+        rows (pd.DataFrame): Raw dataset rows of this shard
+        offset (int): Global row id of the shard's first row
+    """
+    try:
+        shard = NetflixRecommender.from_dataframe(rows)
+        shard.preprocess_data()
+        shard.create_metadata_soup()
+        conn.send(('ok', shard.term_stats()))
+        _, vectorizer = conn.recv()
+        shard.apply_vectorizer(vectorizer)
+        shard.release_metadata_soup()
+        shard.build_filter_masks()
+    except Exception as exc:
+        conn.send(('error', f"{type(exc).__name__}: {exc}"))
+        conn.close()
+        return
+    num_items = len(shard.soup_index)
+    conn.send(('ok', num_items))
+
+    while True:
+        command, *args = conn.recv()
+        if command == 'close':
+            break
+        try:
+            if command == 'vector':
+                reply = shard.item_vectors([args[0] - offset])
+            elif command == 'top_k':
+                query_vector, k, exclude, filters = args
+                exclude = [item - offset for item in exclude if offset <= item < offset + num_items]
+                scores = shard.vector_similarity(query_vector)
+                indices = shard._top_neighbors(scores, k, exclude=exclude, mask=shard.filter_mask(filters))
+                reply = (indices + offset, scores[indices])
+            else:
+                raise ValueError(f"Unknown shard command '{command}'")
+            conn.send(('ok', reply))
+        except Exception as exc:
+            conn.send(('error', f"{type(exc).__name__}: {exc}"))
+    conn.close()
+
+
+class ShardedRecommender:
+    """
+    Serve recommendations from a catalog partitioned across worker processes.
+
+    Each worker holds a contiguous range of rows and reports their term
+    counts; the coordinator merges the counts into one shared vocabulary and
+    idf and sends the fitted vectorizer back, so no process ever builds the
+    TF-IDF matrix of the full catalog. Only the workers keep feature vectors. A query vector is broadcast to
+    every shard, each shard returns its own top-k, and the coordinator merges
+    the sorted lists with a heap. Ties are broken by lower row id, as in the
+    single-process engine, so results are identical.
+    """
+
+    def __init__(self, data_path, num_shards=2, start_method=None):
+        """
+        Initialize the coordinator.
+
+        Args:
+            data_path (str): Path to the Netflix dataset CSV file
+            num_shards (int): Number of worker processes
+            start_method (str): multiprocessing start method, or None for
+                the platform default
+        """
+        self.recommender = NetflixRecommender(data_path)
+        self.num_shards = num_shards
+        self.start_method = start_method
+        self.bounds = None
+        self.processes = []
+        self.connections = []
+
+    @property
+    def catalog(self):
+        return self.recommender.catalog
+
+    def start(self):
+        """
+        Start the shard workers and fit their shared vocabulary.
+
+        The coordinator only preprocesses the catalog, for title lookups and
+        result display; the vocabulary and idf are fitted from the term
+        counts each shard reports.
+        """
+        recommender = self.recommender
+        if recommender.df is None:
+            print("Error: No data loaded. Please load data first.")
+            return
+
+        recommender.preprocess_data()
+
+        print(f"\n--- Starting {self.num_shards} Shards ---")
+        num_items = len(recommender.df)
+        self.bounds = np.linspace(0, num_items, self.num_shards + 1).astype(np.int64)
+        context = multiprocessing.get_context(self.start_method)
+        for start, stop in zip(self.bounds[:-1], self.bounds[1:]):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_serve_shard,
+                args=(child_conn, recommender.df.iloc[start:stop], int(start)),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self.processes.append(process)
+            self.connections.append(parent_conn)
+
+        stats = [self._receive(conn) for conn in self.connections]
+        recommender.tfidf_vectorizer = NetflixRecommender.fit_shared_vectorizer(stats)
+        print(f"Vocabulary size: {len(recommender.tfidf_vectorizer.vocabulary_)}")
+        for conn in self.connections:
+            conn.send(('fit', recommender.tfidf_vectorizer))
+        sizes = [self._receive(conn) for conn in self.connections]
+        print(f"Shard sizes: {sizes}")
+
+    def close(self):
+        """Stop the shard workers."""
+        for conn in self.connections:
+            try:
+                conn.send(('close',))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.processes = []
+        self.connections = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _receive(conn):
+        status, value = conn.recv()
+        if status != 'ok':
+            raise RuntimeError(f"Shard request failed: {value}")
+        return value
+
+    def _shard_of(self, item_id):
+        return int(np.searchsorted(self.bounds, item_id, side='right')) - 1
+
+    def item_vectors(self, item_id):
+        """
+        Fetch the feature vector of a catalog row from the shard holding it.
+
+        Args:
+            item_id (int): Global catalog row id
+
+        Returns:
+            scipy.sparse.csr_matrix: One feature row
+        """
+        conn = self.connections[self._shard_of(item_id)]
+        conn.send(('vector', int(item_id)))
+        return self._receive(conn)
+
+    def top_k_for_vector(self, query_vector, k, exclude=(), filters=None):
+        """
+        Scatter a query vector to every shard and merge their top-k lists.
+
+        Args:
+            query_vector (scipy.sparse.csr_matrix): One normalized feature row
+            k (int): Number of rows to return
+            exclude (list): Global row ids to skip
+            filters (dict): Optional filters, see NetflixRecommender.filter_mask
+
+        Returns:
+            tuple: (row ids, scores), best first
+        """
+        exclude = [int(item) for item in exclude]
+        for conn in self.connections:
+            conn.send(('top_k', query_vector, k, exclude, filters))
+        shard_results = [self._receive(conn) for conn in self.connections]
+
+        merged = heapq.merge(
+            *(zip(scores.tolist(), ids.tolist()) for ids, scores in shard_results),
+            key=lambda entry: (-entry[0], entry[1]),
+        )
+        best = list(islice(merged, k))
+        ids = np.array([item for _, item in best], dtype=np.int64)
+        scores = np.array([score for score, _ in best], dtype=np.float64)
+        return ids, scores
+
+    def get_recommendations(self, title, num_recommendations=10, as_frame=True, filters=None):
+        """
+        Get top N recommendations for a given movie title.
+
+        Args:
+            title (str): Movie/Show title to get recommendations for
+            num_recommendations (int): Number of recommendations to return
+            as_frame (bool): If False, return a lightweight RecommendationResult
+            filters (dict): Optional filters, see NetflixRecommender.filter_mask
+
+        Returns:
+            pd.DataFrame: DataFrame with recommended movies
+        """
+        if not self.connections:
+            print("Error: Shards not started. Run start() first.")
+            return None
+
+        movie_index = self.recommender.resolve_title(title)
+        if movie_index is None:
+            print(f"No movies found matching '{title}'")
+            return None
+
+        query_vector = self.item_vectors(movie_index)
+        ids, scores = self.top_k_for_vector(query_vector, num_recommendations,
+                                            exclude=[movie_index], filters=filters)
+        return self.recommender._make_result(ids, scores, as_frame, meta={'query_id': movie_index})
+
+    def compare_with(self, recommender, titles, num_recommendations=10, filters=None, atol=1e-6):
+        """
+        Check sharded results against a single-process recommender.
+
+        Args:
+            recommender (NetflixRecommender): Built single-process recommender
+                over the same dataset
+            titles (list): Titles to query
+            num_recommendations (int): Number of recommendations per query
+            filters (dict): Optional filters applied to both
+            atol (float): Score tolerance, covering float32 neighbor tables
+
+        Returns:
+            list: Titles whose recommended ids or scores differ
+        """
+        mismatches = []
+        for title in titles:
+            expected = recommender.get_recommendations(title, num_recommendations,
+                                                       as_frame=False, filters=filters)
+            actual = self.get_recommendations(title, num_recommendations,
+                                              as_frame=False, filters=filters)
+            if expected is None or actual is None:
+                if (expected is None) != (actual is None):
+                    mismatches.append(title)
+            elif not (np.array_equal(expected.ids, actual.ids)
+                      and np.allclose(expected.scores, actual.scores, rtol=0, atol=atol)):
+                mismatches.append(title)
+        return mismatches
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import pandas as pd
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """
+    Fingerprint a file by its modification time, size and content hash.
+
+    Args:
+        path (str): File to fingerprint
+        chunk_size (int): Bytes read per step while hashing
+
+    Returns:
+        dict: mtime_ns, size and hash (hex blake2b digest), or None if the
+        file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'hash': digest.hexdigest()}
+
+
+class SourceTracker:
+    """
+    Detect changes to a source file cheaply.
+
+    changed() only stats the file while its mtime and size match the
+    recorded fingerprint; the content is hashed only when they differ, so a
+    touched but unmodified file is not reported as changed.
+    """
+
+    def __init__(self, path):
+        """
+        Record the current fingerprint of a file.
+
+        Args:
+            path (str): File to track
+        """
+        self.path = path
+        self.fingerprint = file_fingerprint(path)
+
+    def changed(self):
+        """
+        Check whether the file content differs from the recorded fingerprint.
+
+        Returns:
+            bool: True if the file was modified, created or removed
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return self.fingerprint is not None
+        if (self.fingerprint is not None and stat.st_mtime_ns == self.fingerprint['mtime_ns']
+                and stat.st_size == self.fingerprint['size']):
+            return False
+
+        current = file_fingerprint(self.path)
+        if self.fingerprint is not None and current is not None and current['hash'] == self.fingerprint['hash']:
+            # Same content with a new mtime; remember it to keep later checks cheap
+            self.fingerprint = current
+            return False
+        return True
+
+    def refresh(self):
+        """Accept the file's current state as the recorded fingerprint."""
+        self.fingerprint = file_fingerprint(self.path)
+
+
+def diff_rows(old_df, new_df, key='show_id'):
+    """
+    Compare two versions of a dataset row by row, matching rows on a key column.
+
+    Args:
+        old_df (pd.DataFrame): Previous dataset
+        new_df (pd.DataFrame): Current dataset
+        key (str): Column identifying a row across versions
+
+    Returns:
+        dict: Counts of added, removed, modified and unchanged rows and the
+        changed_fraction of the larger version, or None when the versions
+        cannot be matched row by row (different columns, or a missing or
+        non-unique key)
+    """
+    if list(old_df.columns) != list(new_df.columns) or key not in new_df.columns:
+        return None
+    if not (old_df[key].is_unique and new_df[key].is_unique):
+        return None
+
+    old_hashes = pd.util.hash_pandas_object(old_df, index=False)
+    new_hashes = pd.util.hash_pandas_object(new_df, index=False)
+    old_hashes.index = old_df[key].to_numpy()
+    new_hashes.index = new_df[key].to_numpy()
+
+    common = new_hashes.index.intersection(old_hashes.index)
+    modified = int((new_hashes[common].to_numpy() != old_hashes[common].to_numpy()).sum())
+    added = len(new_hashes) - len(common)
+    removed = len(old_hashes) - len(common)
+    return {
+        'added': added,
+        'removed': removed,
+        'modified': modified,
+        'unchanged': len(common) - modified,
+        'changed_fraction': (added + removed + modified) / max(len(old_df), len(new_df), 1),
+    }
@@ -0,0 +1,123 @@
+import re
+import unicodedata
+from bisect import bisect_left
+import numpy as np
+
+
+def normalize_title(text):
+    """
+    Normalize a title for matching: strip accents, lowercase, and collapse
+    everything but letters and digits into single spaces.
+
+    Args:
+        text (str): Title or query
+
+    Returns:
+        str: Normalized text
+    """
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def _trigrams(text):
+    """Character trigrams of normalized text, padded so word starts count."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleSearchIndex:
+    """
+    Typeahead index over catalog titles.
+
+    Titles are matched on normalized text in two ways: prefix matches, found
+    by bisecting sorted title and word suffixes, and character-trigram
+    overlap, counted from per-trigram postings lists. A query only touches
+    the postings of its own trigrams and the prefix ranges it falls in.
+
+    Titles are stored shortest first, so among equal scores the shorter,
+    closer match ranks higher.
+    """
+
+    # Bonus added to the trigram overlap (at most 1.0) for prefix matches
+    TITLE_PREFIX_BONUS = 2.0
+    WORD_PREFIX_BONUS = 1.0
+
+    # Prefix entries scanned per requested match, bounding one-letter queries
+    PREFIX_SCAN_FACTOR = 50
+
+    def __init__(self, titles):
+        """
+        Build the index.
+
+        Args:
+            titles (iterable): Distinct titles to index
+        """
+        normalized = {}
+        for title in titles:
+            if title is not None:
+                normalized.setdefault(title, normalize_title(title))
+        order = sorted(normalized, key=lambda title: (len(normalized[title]), normalized[title]))
+        self.titles = order
+        keys = [normalized[title] for title in order]
+
+        title_entries = sorted((key, i) for i, key in enumerate(keys))
+        self._title_keys = [key for key, _ in title_entries]
+        self._title_ids = np.array([i for _, i in title_entries], dtype=np.int32)
+
+        word_entries = sorted(
+            (key[match.start():], i)
+            for i, key in enumerate(keys)
+            for match in re.finditer(r' (?=\w)', key)
+        )
+        self._word_keys = [key[1:] for key, _ in word_entries]
+        self._word_ids = np.array([i for _, i in word_entries], dtype=np.int32)
+
+        postings = {}
+        for i, key in enumerate(keys):
+            for gram in _trigrams(key):
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _prefix_range(self, keys, ids, query, limit):
+        start = bisect_left(keys, query)
+        stop = bisect_left(keys, query + '\uffff', lo=start)
+        return ids[start:min(stop, start + limit * self.PREFIX_SCAN_FACTOR)]
+
+    def search(self, query, limit=10):
+        """
+        Find the titles best matching a partial query.
+
+        Args:
+            query (str): Text typed so far
+            limit (int): Maximum number of titles to return
+
+        Returns:
+            list: Matching titles, best first
+        """
+        query = normalize_title(query)
+        if not query or limit <= 0:
+            return []
+
+        scores = np.zeros(len(self.titles))
+        grams = _trigrams(query)
+        lists = [self._postings[gram] for gram in grams if gram in self._postings]
+        if lists:
+            scores += np.bincount(np.concatenate(lists), minlength=len(self.titles)) / len(grams)
+        word_matches = self._prefix_range(self._word_keys, self._word_ids, query, limit)
+        scores[word_matches] += self.WORD_PREFIX_BONUS
+        title_matches = self._prefix_range(self._title_keys, self._title_ids, query, limit)
+        scores[title_matches] += self.TITLE_PREFIX_BONUS
+
+        # Keep titles sharing at least a third of the query's trigrams
+        candidates = np.flatnonzero(scores >= 1 / 3)
+        if len(candidates) > limit:
+            # Partition on score, then break ties by lower id (shorter title)
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            threshold = scores[candidates[top]].min()
+            candidates = candidates[scores[candidates] >= threshold]
+        ranked = candidates[np.lexsort((candidates, -scores[candidates]))][:limit]
+        return [self.titles[i] for i in ranked]
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class TokenCache:
+    """
+    Persistent cache of cleaned text keyed by a hash of the raw text.
+    
+    Entries live in a SQLite file so they survive rebuilds and restarts.
+    The cache holds at most max_entries entries; when it grows past that,
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, max_entries=200000, namespace=''):
+        """
+        Open or create the cache.
+        
+        Args:
+            path (str): Path of the SQLite cache file
+            max_entries (int): Maximum number of cached entries
+            namespace (str): Mixed into every key, so a change to the
+                cleaning logic can invalidate old entries
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens (key BLOB PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tokens_last_used ON tokens (last_used)")
+        self._conn.commit()
+
+    def key(self, text):
+        """
+        Hash raw text into a cache key.
+        
+        Args:
+            text (str): Raw text
+            
+        Returns:
+            bytes: 16-byte BLAKE2b digest of the namespace and text
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.namespace.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(text.encode('utf-8'))
+        return digest.digest()
+
+    def get_many(self, keys):
+        """
+        Look up several keys and mark the hits as recently used.
+        
+        Args:
+            keys (list): Cache keys
+            
+        Returns:
+            dict: Key to cached value for the keys that were found
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM tokens WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time_ns()
+                self._conn.executemany("UPDATE tokens SET last_used = ? WHERE key = ?",
+                                       [(now, key) for key in found])
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """
+        Store several entries, then evict down to max_entries if needed.
+        
+        Args:
+            items (dict): Key to value
+        """
+        if not items:
+            return
+        now = time.time_ns()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tokens (key, value, last_used) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items.items()]
+            )
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM tokens WHERE key IN (SELECT key FROM tokens ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+            self._conn.commit()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+
+    def stats(self):
+        """
+        Get hit statistics since the last reset.
+        
+        Returns:
+            dict: Hits, misses and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from recommendation_engine import ARTIFACT_ARRAYS
+from results import RecommendationResult
+
+# Bytes between touched addresses when paging in memory-mapped arrays
+PAGE_SIZE = 4096
+
+# Marks a cached query that had no results, as opposed to a cache miss
+_NO_RESULT = object()
+
+
+def run_query(recommender, kind, query, num_recommendations):
+    """
+    Run one recommendation query by kind.
+
+    Args:
+        recommender (NetflixRecommender): Built recommender
+        kind (str): 'title', 'text' or 'tag'
+        query: Title, free text, or list of tags
+        num_recommendations (int): Number of recommendations
+
+    Returns:
+        RecommendationResult: Recommendations, or None if nothing matched
+    """
+    if kind == 'title':
+        return recommender.get_recommendations(query, num_recommendations, as_frame=False)
+    if kind == 'text':
+        return recommender.get_recommendations_by_text(query, num_recommendations, as_frame=False)
+    if kind == 'tag':
+        return recommender.get_recommendations_by_multiple_tags(list(query), num_recommendations, as_frame=False)
+    raise ValueError(f"Unknown query kind '{kind}'; use 'title', 'text' or 'tag'")
+
+
+class ResultCache:
+    """
+    Least-recently-used cache of recommendation results shared by sessions.
+
+    Entries are stored as RecommendationResult.to_state() dicts, so a cached
+    result costs its ids and scores, not its display columns. Keys include
+    the model version, so a model swap leaves old entries to age out.
+    """
+
+    def __init__(self, max_entries=1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Number of results kept before evicting
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(version, kind, query, num_recommendations):
+        """Build the cache key of a query; tag lists become tuples."""
+        if isinstance(query, list):
+            query = tuple(query)
+        return version, kind, query, num_recommendations
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result state for key, computing it on a miss.
+
+        Args:
+            key (tuple): Key from ResultCache.key
+            compute (callable): Called with no arguments; returns a
+                RecommendationResult or None
+
+        Returns:
+            dict: to_state() of the result, or None if the query had none
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                state = self._entries[key]
+                return None if state is _NO_RESULT else state
+            self.misses += 1
+        result = compute()
+        state = result.to_state() if result is not None else None
+        with self._lock:
+            self._entries[key] = _NO_RESULT if state is None else state
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return state
+
+    def query(self, recommender, version, kind, query, num_recommendations):
+        """
+        Run a query through the cache.
+
+        Args:
+            recommender (NetflixRecommender): Recommender of this model version
+            version (int): Model version the recommender belongs to
+            kind (str): 'title', 'text' or 'tag'
+            query: Title, free text, or list of tags
+            num_recommendations (int): Number of recommendations
+
+        Returns:
+            RecommendationResult: Recommendations, or None if nothing matched
+        """
+        state = self.get_or_compute(
+            self.key(version, kind, query, num_recommendations),
+            lambda: run_query(recommender, kind, query, num_recommendations),
+        )
+        return None if state is None else RecommendationResult.from_state(state, recommender.catalog)
+
+
+def hot_queries(recommender, titles=(), num_titles=20, num_tags=10):
+    """
+    Pick the queries worth answering before the first user arrives.
+
+    Titles are the given ones followed by the rows that appear in the most
+    neighbor lists, i.e. the titles users are most often led to. Tags are
+    the genres carried by the most rows.
+
+    Args:
+        recommender (NetflixRecommender): Built recommender
+        titles (iterable): Titles to always include, e.g. from analytics
+        num_titles (int): Total number of title queries
+        num_tags (int): Number of single-tag queries
+
+    Returns:
+        list: (kind, query) tuples
+    """
+    queries = [('title', title) for title in titles]
+    if recommender.neighbor_ids is not None and len(queries) < num_titles:
+        # Each soup's list is shared by every row holding that soup
+        rows_per_soup = np.bincount(recommender.soup_index, minlength=recommender.neighbor_ids.shape[0])
+        appearances = np.bincount(
+            np.asarray(recommender.neighbor_ids).ravel(),
+            weights=np.repeat(rows_per_soup, recommender.neighbor_ids.shape[1]),
+            minlength=len(recommender.soup_index),
+        )
+        # Most appearances first, lower row id first among ties
+        ranked = np.lexsort((np.arange(len(appearances)), -appearances))
+        seen = set(titles)
+        for title in recommender.catalog.take('title', ranked):
+            if len(queries) >= num_titles:
+                break
+            if title is not None and title not in seen:
+                seen.add(title)
+                queries.append(('title', title))
+
+    tag_counts = recommender.get_tag_counts()
+    queries.extend(('tag', [tag]) for tag in list(tag_counts)[:num_tags])
+    return queries
+
+
+def touch_pages(recommender):
+    """
+    Read one byte per page of the model's memory-mapped arrays.
+
+    A model loaded with mmap_mode reads its arrays from disk on first
+    access; touching every page up front moves those faults out of the
+    first queries.
+
+    Args:
+        recommender (NetflixRecommender): Recommender, typically from load()
+
+    Returns:
+        int: Bytes of memory-mapped data paged in
+    """
+    arrays = [getattr(recommender, name) for name in ARTIFACT_ARRAYS]
+    if recommender.tfidf_matrix is not None:
+        matrix = recommender.tfidf_matrix
+        arrays += [matrix.data, matrix.indices, matrix.indptr]
+
+    touched = 0
+    for array in arrays:
+        if isinstance(array, np.memmap) or isinstance(getattr(array, 'base', None), np.memmap):
+            raw = np.asarray(array).reshape(-1).view(np.uint8)
+            int(raw[::PAGE_SIZE].sum())
+            touched += raw.nbytes
+    return touched
+
+
+def warm_up(recommender, cache=None, version=0, queries=None, num_recommendations=(5, 10)):
+    """
+    Page in a model and fill the result cache with hot queries.
+
+    Args:
+        recommender (NetflixRecommender): Built or loaded recommender
+        cache (ResultCache): Cache to fill; queries are only run when None
+        version (int): Model version used in the cache keys
+        queries (list): (kind, query) tuples; defaults to hot_queries()
+        num_recommendations (iterable): Result sizes to cache per query,
+            e.g. the UI's default slider value
+
+    Returns:
+        dict: seconds, bytes paged in, queries run and cache entries added
+    """
+    print(f"\n--- Warming Up ---")
+    start = time.perf_counter()
+    paged = touch_pages(recommender)
+    if queries is None:
+        queries = hot_queries(recommender)
+
+    entries = len(cache) if cache is not None else 0
+    runs = 0
+    for kind, query in queries:
+        for n in num_recommendations:
+            if cache is not None:
+                cache.query(recommender, version, kind, query, n)
+            else:
+                run_query(recommender, kind, query, n)
+            runs += 1
+
+    stats = {
+        'seconds': time.perf_counter() - start,
+        'paged_bytes': paged,
+        'queries': runs,
+        'cached': (len(cache) - entries) if cache is not None else 0,
+    }
+    print(f"Warm-up: {runs} queries, {paged / 1024 / 1024:.1f} MB paged in, "
+          f"{stats['seconds']:.2f}s")
+    return stats